@@ -1,7 +1,10 @@
+use numpy::{IntoPyArray, PyArray1};
+use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
+use pyo3::types::{PyDict, PyList};
 use serde::{Deserialize, Serialize};
 use std::cmp::Ordering;
-use std::collections::{BTreeMap, HashMap};
+use std::collections::{BTreeMap, HashMap, VecDeque};
 
 /// Python module Enums
 #[pyclass]
@@ -105,11 +108,40 @@ pub struct Trade {
     pub symbol: Option<String>,
 }
 
+/// Trades as columns: (ids, buy order ids, sell order ids, prices, quantities,
+/// timestamps, symbols)
+pub type TradeColumns = (
+    Vec<u64>,
+    Vec<u64>,
+    Vec<u64>,
+    Vec<f64>,
+    Vec<f64>,
+    Vec<u64>,
+    Vec<Option<String>>,
+);
+
+/// Numeric trade columns (ids, buy ids, sell ids, prices, quantities, timestamps)
+pub type TradeArrayColumns = (Vec<u64>, Vec<u64>, Vec<u64>, Vec<f64>, Vec<f64>, Vec<u64>);
+
+/// TradeArrayColumns as NumPy arrays owning the column buffers
+pub type TradeArrays<'py> = (
+    &'py PyArray1<u64>,
+    &'py PyArray1<u64>,
+    &'py PyArray1<u64>,
+    &'py PyArray1<f64>,
+    &'py PyArray1<f64>,
+    &'py PyArray1<u64>,
+);
+
+/// Price levels as columns, best price first: (buy prices, buy quantities,
+/// sell prices, sell quantities)
+pub type LevelColumns = (Vec<f64>, Vec<f64>, Vec<f64>, Vec<f64>);
+
 /// PriceLevel struct for aggregating orders at the same price
 #[derive(Debug, Clone)]
 pub struct PriceLevel {
     pub price: f64,
-    pub orders: Vec<Order>,
+    pub orders: VecDeque<Order>,
     pub total_quantity_cache: f64,
     pub is_dirty: bool,
 }
@@ -118,7 +150,7 @@ impl PriceLevel {
     pub fn new(price: f64) -> Self {
         PriceLevel {
             price,
-            orders: Vec::with_capacity(16), // Pre-allocate to avoid frequent reallocations
+            orders: VecDeque::with_capacity(16), // Pre-allocate to avoid frequent reallocations
             total_quantity_cache: 0.0,
             is_dirty: false,
         }
@@ -126,14 +158,15 @@ impl PriceLevel {
 
     pub fn add_order(&mut self, order: Order) {
         self.total_quantity_cache += order.remaining_quantity;
-        self.orders.push(order);
+        self.orders.push_back(order);
     }
 
     pub fn remove_order(&mut self, order_id: u64) -> Option<Order> {
         if let Some(pos) = self.orders.iter().position(|o| o.id == order_id) {
-            let order = self.orders.swap_remove(pos); // Use swap_remove for O(1) removal
+            // VecDeque::remove shifts the shorter side, keeping the queue in FIFO order
+            let order = self.orders.remove(pos);
             self.is_dirty = true;
-            Some(order)
+            order
         } else {
             None
         }
@@ -472,19 +505,16 @@ impl OrderBook {
                         break; // Stop if the order is filled
                     }
 
-                    // Perform the matching - extract orders to be processed from the level
+                    // Perform the matching against the front of the level's queue
                     if let Some(level) = self.sell_price_levels.get_mut(&price_bits) {
-                        // Extract orders to process
-                        let orders_to_process = std::mem::take(&mut level.orders);
                         let price = level.price;
 
-                        // Match orders
-                        let mut orders_to_keep = Vec::new();
-                        for mut sell_order in orders_to_process {
+                        // Match orders front to back, popping each resting order off the queue
+                        while let Some(mut sell_order) = level.orders.pop_front() {
                             if order.remaining_quantity <= 0.0 {
-                                // No more quantity to fill, keep the remaining orders
-                                orders_to_keep.push(sell_order);
-                                continue;
+                                // No more quantity to fill, put the order back at the front
+                                level.orders.push_front(sell_order);
+                                break;
                             }
 
                             // Calculate trade quantity
@@ -528,20 +558,20 @@ impl OrderBook {
                                 self.trades.push(trade);
                                 self.stats.trades_executed += 1;
 
-                                // Keep partially filled orders
+                                // A partially filled order keeps its place at the front of the queue
                                 if sell_order.status != OrderStatus::Filled {
-                                    orders_to_keep.push(sell_order);
+                                    level.orders.push_front(sell_order);
+                                    break;
                                 } else {
                                     // Remove filled orders from the lookup map
                                     self.orders_by_id.remove(&sell_order.id);
                                 }
                             } else {
-                                orders_to_keep.push(sell_order);
+                                // Nothing left on the resting order: drop it rather than let it block the level
+                                self.orders_by_id.remove(&sell_order.id);
                             }
                         }
 
-                        // Update the level with remaining orders
-                        level.orders = orders_to_keep;
                         level.is_dirty = true;
 
                         // Check if level became empty after matching
@@ -574,19 +604,16 @@ impl OrderBook {
                         break; // Stop if the order is filled
                     }
 
-                    // Perform the matching - extract orders to be processed from the level
+                    // Perform the matching against the front of the level's queue
                     if let Some(level) = self.buy_price_levels.get_mut(&price_bits) {
-                        // Extract orders to process
-                        let orders_to_process = std::mem::take(&mut level.orders);
                         let price = level.price;
 
-                        // Match orders
-                        let mut orders_to_keep = Vec::new();
-                        for mut buy_order in orders_to_process {
+                        // Match orders front to back, popping each resting order off the queue
+                        while let Some(mut buy_order) = level.orders.pop_front() {
                             if order.remaining_quantity <= 0.0 {
-                                // No more quantity to fill, keep the remaining orders
-                                orders_to_keep.push(buy_order);
-                                continue;
+                                // No more quantity to fill, put the order back at the front
+                                level.orders.push_front(buy_order);
+                                break;
                             }
 
                             // Calculate trade quantity
@@ -630,20 +657,20 @@ impl OrderBook {
                                 self.trades.push(trade);
                                 self.stats.trades_executed += 1;
 
-                                // Keep partially filled orders
+                                // A partially filled order keeps its place at the front of the queue
                                 if buy_order.status != OrderStatus::Filled {
-                                    orders_to_keep.push(buy_order);
+                                    level.orders.push_front(buy_order);
+                                    break;
                                 } else {
                                     // Remove filled orders from the lookup map
                                     self.orders_by_id.remove(&buy_order.id);
                                 }
                             } else {
-                                orders_to_keep.push(buy_order);
+                                // Nothing left on the resting order: drop it rather than let it block the level
+                                self.orders_by_id.remove(&buy_order.id);
                             }
                         }
 
-                        // Update the level with remaining orders
-                        level.orders = orders_to_keep;
                         level.is_dirty = true;
 
                         // Check if level became empty after matching
@@ -695,19 +722,16 @@ impl OrderBook {
                         break; // Stop if the order is filled
                     }
 
-                    // Perform the matching - extract orders to be processed from the level
+                    // Perform the matching against the front of the level's queue
                     if let Some(level) = self.sell_price_levels.get_mut(&price_bits) {
-                        // Extract orders to process
-                        let orders_to_process = std::mem::take(&mut level.orders);
                         let price = level.price;
 
-                        // Match orders
-                        let mut orders_to_keep = Vec::new();
-                        for mut sell_order in orders_to_process {
+                        // Match orders front to back, popping each resting order off the queue
+                        while let Some(mut sell_order) = level.orders.pop_front() {
                             if order.remaining_quantity <= 0.0 {
-                                // No more quantity to fill, keep the remaining orders
-                                orders_to_keep.push(sell_order);
-                                continue;
+                                // No more quantity to fill, put the order back at the front
+                                level.orders.push_front(sell_order);
+                                break;
                             }
 
                             // Calculate trade quantity
@@ -751,20 +775,20 @@ impl OrderBook {
                                 self.trades.push(trade);
                                 self.stats.trades_executed += 1;
 
-                                // Keep partially filled orders
+                                // A partially filled order keeps its place at the front of the queue
                                 if sell_order.status != OrderStatus::Filled {
-                                    orders_to_keep.push(sell_order);
+                                    level.orders.push_front(sell_order);
+                                    break;
                                 } else {
                                     // Remove filled orders from the lookup map
                                     self.orders_by_id.remove(&sell_order.id);
                                 }
                             } else {
-                                orders_to_keep.push(sell_order);
+                                // Nothing left on the resting order: drop it rather than let it block the level
+                                self.orders_by_id.remove(&sell_order.id);
                             }
                         }
 
-                        // Update the level with remaining orders
-                        level.orders = orders_to_keep;
                         level.is_dirty = true;
 
                         // Check if level became empty after matching
@@ -800,19 +824,16 @@ impl OrderBook {
                         break; // Stop if the order is filled
                     }
 
-                    // Perform the matching - extract orders to be processed from the level
+                    // Perform the matching against the front of the level's queue
                     if let Some(level) = self.buy_price_levels.get_mut(&price_bits) {
-                        // Extract orders to process
-                        let orders_to_process = std::mem::take(&mut level.orders);
                         let price = level.price;
 
-                        // Match orders
-                        let mut orders_to_keep = Vec::new();
-                        for mut buy_order in orders_to_process {
+                        // Match orders front to back, popping each resting order off the queue
+                        while let Some(mut buy_order) = level.orders.pop_front() {
                             if order.remaining_quantity <= 0.0 {
-                                // No more quantity to fill, keep the remaining orders
-                                orders_to_keep.push(buy_order);
-                                continue;
+                                // No more quantity to fill, put the order back at the front
+                                level.orders.push_front(buy_order);
+                                break;
                             }
 
                             // Calculate trade quantity
@@ -856,20 +877,20 @@ impl OrderBook {
                                 self.trades.push(trade);
                                 self.stats.trades_executed += 1;
 
-                                // Keep partially filled orders
+                                // A partially filled order keeps its place at the front of the queue
                                 if buy_order.status != OrderStatus::Filled {
-                                    orders_to_keep.push(buy_order);
+                                    level.orders.push_front(buy_order);
+                                    break;
                                 } else {
                                     // Remove filled orders from the lookup map
                                     self.orders_by_id.remove(&buy_order.id);
                                 }
                             } else {
-                                orders_to_keep.push(buy_order);
+                                // Nothing left on the resting order: drop it rather than let it block the level
+                                self.orders_by_id.remove(&buy_order.id);
                             }
                         }
 
-                        // Update the level with remaining orders
-                        level.orders = orders_to_keep;
                         level.is_dirty = true;
 
                         // Check if level became empty after matching
@@ -938,6 +959,49 @@ impl OrderBook {
         (buy_snapshot, sell_snapshot)
     }
 
+    /// Price levels as (price, quantity, order_count), best price first on each side.
+    /// Both maps are keyed so that ascending iteration is already best-first.
+    pub fn get_detailed_snapshot(
+        &mut self,
+    ) -> (Vec<(f64, f64, usize)>, Vec<(f64, f64, usize)>) {
+        let mut buy_snapshot = Vec::with_capacity(self.buy_price_levels.len());
+        for (&price_bits, level) in &mut self.buy_price_levels {
+            let price = Self::bits_to_price(price_bits, true);
+            buy_snapshot.push((price, level.total_quantity(), level.orders.len()));
+        }
+
+        let mut sell_snapshot = Vec::with_capacity(self.sell_price_levels.len());
+        for (&price_bits, level) in &mut self.sell_price_levels {
+            let price = Self::bits_to_price(price_bits, false);
+            sell_snapshot.push((price, level.total_quantity(), level.orders.len()));
+        }
+
+        (buy_snapshot, sell_snapshot)
+    }
+
+    /// Level prices and quantities as columns, best price first on each side
+    pub fn get_level_columns(&mut self) -> LevelColumns {
+        let mut columns: LevelColumns = (
+            Vec::with_capacity(self.buy_price_levels.len()),
+            Vec::with_capacity(self.buy_price_levels.len()),
+            Vec::with_capacity(self.sell_price_levels.len()),
+            Vec::with_capacity(self.sell_price_levels.len()),
+        );
+        for (&price_bits, level) in &mut self.buy_price_levels {
+            columns.0.push(Self::bits_to_price(price_bits, true));
+            columns.1.push(level.total_quantity());
+        }
+        for (&price_bits, level) in &mut self.sell_price_levels {
+            columns.2.push(Self::bits_to_price(price_bits, false));
+            columns.3.push(level.total_quantity());
+        }
+        columns
+    }
+
+    pub fn total_orders(&self) -> usize {
+        self.orders_by_id.len()
+    }
+
     fn get_trades(&self, limit: Option<usize>) -> PyResult<Vec<PyTrade>> {
         let trades = if let Some(l) = limit {
             // Take the last 'l' trades
@@ -964,6 +1028,58 @@ impl OrderBook {
         Ok(py_trades)
     }
 
+    /// Trade columns (ids, buy ids, sell ids, prices, quantities, timestamps, symbols)
+    /// for the last `limit` trades, or all of them
+    pub fn get_trade_columns(&self, limit: Option<usize>) -> TradeColumns {
+        let start_index = limit.map_or(0, |l| self.trades.len().saturating_sub(l));
+        let trades = &self.trades[start_index..];
+
+        let mut columns: TradeColumns = (
+            Vec::with_capacity(trades.len()),
+            Vec::with_capacity(trades.len()),
+            Vec::with_capacity(trades.len()),
+            Vec::with_capacity(trades.len()),
+            Vec::with_capacity(trades.len()),
+            Vec::with_capacity(trades.len()),
+            Vec::with_capacity(trades.len()),
+        );
+        for t in trades {
+            columns.0.push(t.id);
+            columns.1.push(t.buy_order_id);
+            columns.2.push(t.sell_order_id);
+            columns.3.push(t.price);
+            columns.4.push(t.quantity);
+            columns.5.push(t.timestamp);
+            columns.6.push(t.symbol.clone());
+        }
+        columns
+    }
+
+    /// Numeric trade columns for the last `limit` trades, or all of them; symbols are
+    /// left out so no strings are cloned
+    pub fn get_trade_array_columns(&self, limit: Option<usize>) -> TradeArrayColumns {
+        let start_index = limit.map_or(0, |l| self.trades.len().saturating_sub(l));
+        let trades = &self.trades[start_index..];
+
+        let mut columns: TradeArrayColumns = (
+            Vec::with_capacity(trades.len()),
+            Vec::with_capacity(trades.len()),
+            Vec::with_capacity(trades.len()),
+            Vec::with_capacity(trades.len()),
+            Vec::with_capacity(trades.len()),
+            Vec::with_capacity(trades.len()),
+        );
+        for t in trades {
+            columns.0.push(t.id);
+            columns.1.push(t.buy_order_id);
+            columns.2.push(t.sell_order_id);
+            columns.3.push(t.price);
+            columns.4.push(t.quantity);
+            columns.5.push(t.timestamp);
+        }
+        columns
+    }
+
     pub fn get_statistics(&self) -> OrderBookStats {
         self.stats.clone()
     }
@@ -1027,6 +1143,28 @@ struct PyTrade {
     symbol: Option<String>,
 }
 
+#[pymethods]
+impl PyTrade {
+    /// Same name as Trade.trade_id, so both trade types expose the same fields
+    #[getter]
+    fn trade_id(&self) -> u64 {
+        self.id
+    }
+}
+
+/// Convert (price, quantity, order_count) levels into a list of level dicts
+fn levels_to_pylist<'py>(py: Python<'py>, levels: &[(f64, f64, usize)]) -> PyResult<&'py PyList> {
+    let list = PyList::empty(py);
+    for &(price, quantity, order_count) in levels {
+        let level = PyDict::new(py);
+        level.set_item("price", price)?;
+        level.set_item("quantity", quantity)?;
+        level.set_item("order_count", order_count)?;
+        list.append(level)?;
+    }
+    Ok(list)
+}
+
 /// Python order book class
 #[pyclass]
 struct PyOrderBook {
@@ -1082,6 +1220,63 @@ impl PyOrderBook {
             .add_order(side, OrderType::Market, None, quantity, timestamp, None))
     }
 
+    /// Add a batch of orders in one call, matched in submission order exactly as if
+    /// each were added on its own. Sides and order types use the Python enum values
+    /// (side: 1 = buy, 2 = sell; type: 1 = market, 2 = limit); prices of market
+    /// orders are ignored. The GIL is released while the batch is matched.
+    #[pyo3(signature = (sides, order_types, prices, quantities, timestamps))]
+    fn batch_add_orders(
+        &mut self,
+        py: Python,
+        sides: Vec<u8>,
+        order_types: Vec<u8>,
+        prices: Vec<f64>,
+        quantities: Vec<f64>,
+        timestamps: Vec<u64>,
+    ) -> PyResult<Vec<u64>> {
+        let n = sides.len();
+        if order_types.len() != n
+            || prices.len() != n
+            || quantities.len() != n
+            || timestamps.len() != n
+        {
+            return Err(PyValueError::new_err(
+                "order columns must all have the same length",
+            ));
+        }
+
+        // Validate everything up front so a bad row cannot leave a half-applied batch
+        let mut orders = Vec::with_capacity(n);
+        for i in 0..n {
+            let side = match sides[i] {
+                1 => OrderSide::Buy,
+                2 => OrderSide::Sell,
+                v => return Err(PyValueError::new_err(format!("invalid side value {}", v))),
+            };
+            let (order_type, price) = match order_types[i] {
+                1 => (OrderType::Market, None),
+                2 => (OrderType::Limit, Some(prices[i])),
+                v => {
+                    return Err(PyValueError::new_err(format!(
+                        "invalid order type value {}",
+                        v
+                    )))
+                }
+            };
+            orders.push((side, order_type, price, quantities[i], timestamps[i]));
+        }
+
+        let order_book = &mut self.order_book;
+        Ok(py.allow_threads(move || {
+            orders
+                .into_iter()
+                .map(|(side, order_type, price, quantity, timestamp)| {
+                    order_book.add_order(side, order_type, price, quantity, timestamp, None)
+                })
+                .collect()
+        }))
+    }
+
     fn cancel_order(&mut self, order_id: u64) -> PyResult<bool> {
         Ok(self.order_book.cancel_order(order_id))
     }
@@ -1090,10 +1285,62 @@ impl PyOrderBook {
         Ok(self.order_book.get_order_book_snapshot())
     }
 
+    /// Build the detailed snapshot dict (sides with order counts, spread, mid price
+    /// and total orders) directly on the Rust side.
+    fn get_snapshot(&mut self, py: Python) -> PyResult<PyObject> {
+        let (buy_levels, sell_levels) = self.order_book.get_detailed_snapshot();
+
+        let best = match (buy_levels.first(), sell_levels.first()) {
+            (Some(bid), Some(ask)) => Some((bid.0, ask.0)),
+            _ => None,
+        };
+
+        let snapshot = PyDict::new(py);
+        snapshot.set_item("buy_side", levels_to_pylist(py, &buy_levels)?)?;
+        snapshot.set_item("sell_side", levels_to_pylist(py, &sell_levels)?)?;
+        snapshot.set_item("spread", best.map(|(bid, ask)| ask - bid))?;
+        snapshot.set_item("mid_price", best.map(|(bid, ask)| (ask + bid) / 2.0))?;
+        snapshot.set_item("total_orders", self.order_book.total_orders())?;
+        Ok(snapshot.into())
+    }
+
     #[pyo3(signature = (limit = None))]
     fn get_trades(&self, limit: Option<usize>) -> PyResult<Vec<PyTrade>> {
         self.order_book.get_trades(limit)
     }
+
+    /// Number of trades executed so far, without copying the trade history
+    fn get_trade_count(&self) -> u64 {
+        self.order_book.next_trade_id - 1
+    }
+
+    /// Level prices and quantities as four parallel lists in one call, instead of one
+    /// dict per level
+    fn get_level_columns(&mut self) -> PyResult<LevelColumns> {
+        Ok(self.order_book.get_level_columns())
+    }
+
+    /// Trades as seven parallel lists in one call, instead of one PyTrade object each
+    #[pyo3(signature = (limit = None))]
+    fn get_trade_columns(&self, limit: Option<usize>) -> PyResult<TradeColumns> {
+        Ok(self.order_book.get_trade_columns(limit))
+    }
+
+    /// Trades as six NumPy arrays; each column Vec is handed to its array without a
+    /// copy or any per-trade Python object
+    #[pyo3(signature = (limit = None))]
+    fn get_trade_arrays<'py>(&self, py: Python<'py>, limit: Option<usize>) -> PyResult<TradeArrays<'py>> {
+        let (ids, buy_ids, sell_ids, prices, quantities, timestamps) =
+            self.order_book.get_trade_array_columns(limit);
+        Ok((
+            ids.into_pyarray(py),
+            buy_ids.into_pyarray(py),
+            sell_ids.into_pyarray(py),
+            prices.into_pyarray(py),
+            quantities.into_pyarray(py),
+            timestamps.into_pyarray(py),
+        ))
+    }
 }
 
 #[pymodule]
@@ -2,7 +2,7 @@
 Core matching engine components.
 """
 from py_rs_quant.core.enums import OrderSide, OrderType, OrderStatus
-from py_rs_quant.core.models import Order, Trade, PriceLevel
+from py_rs_quant.core.models import ORDER_DTYPE, Order, Trade, PriceLevel
 from py_rs_quant.core.order_book import OrderBook
 from py_rs_quant.core.engine import MatchingEngine
 from py_rs_quant.core.trade_execution import TradeExecutor
@@ -27,6 +27,7 @@ __all__ = [
     'Order',
     'Trade',
     'PriceLevel',
+    'ORDER_DTYPE',
     'Matcher',
     'OrderProcessor',
     'OrderBook',
@@ -0,0 +1,46 @@
+"""
+Ahead-of-time build of the numba kernels in utils.py.
+
+Run ``python -m py_rs_quant.core._kernels_build`` to compile them into the
+``py_rs_quant.core._kernels`` extension next to this file. utils.py imports the
+compiled kernels when the extension is present, so the first call in a fresh
+process skips JIT compilation; without it, the kernels are JIT-compiled as usual.
+
+Kernels are compiled for the fixed signatures the engine calls them with (float64
+and bool arrays of any layout). group_price_levels is left to the JIT: AOT
+compilation does not support parallel=True.
+"""
+import os
+import sys
+
+from numba.pycc import CC
+
+# Exported name -> signature
+KERNEL_SIGNATURES = {
+    "min_quantity": "f8(f8, f8)",
+    "calculate_trade_qty": "f8(f8, f8)",
+    "update_quantities": "UniTuple(f8, 2)(f8, f8, f8)",
+    "calculate_match_price": "f8(f8, b1)",
+    "update_order_status": "i8(f8, i8, i8)",
+    "summarize_levels": "UniTuple(f8, 2)(f8[:], f8[:])",
+    "passive_run_end": "i8(b1[:], b1[:], f8[:], f8[:], i8, f8, f8)",
+    "calculate_price_stats": "UniTuple(f8, 6)(f8[:], f8[:])",
+    "check_order_core": "i8(f8, f8, f8, f8, f8, f8, f8, f8, f8, f8)",
+}
+
+
+def build() -> None:
+    """Compile the kernels into py_rs_quant/core/_kernels."""
+    # Keep a previous build out of the way: the sources must be the JIT dispatchers
+    sys.modules["py_rs_quant.core._kernels"] = None
+    from py_rs_quant.core import utils
+
+    cc = CC("_kernels")
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+    for name, signature in KERNEL_SIGNATURES.items():
+        cc.export(name, signature)(getattr(utils, name).py_func)
+    cc.compile()
+
+
+if __name__ == "__main__":
+    build()
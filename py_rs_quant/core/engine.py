@@ -5,6 +5,8 @@ import time
 import logging
 from typing import Dict, List, Optional, Tuple, Any, Callable
 
+import numpy as np
+
 from py_rs_quant.core.enums import OrderSide, OrderType, OrderStatus
 from py_rs_quant.core.models import Order, Trade
 from py_rs_quant.core.order_book import OrderBook
@@ -27,13 +29,21 @@ class MatchingEngine:
     
     __slots__ = (
         'order_book', 'trade_executor', 'statistics', 'matcher', 'order_processor',
-        '_trade_pool', '_max_trade_pool_size'
+        '_trade_pool', '_max_trade_pool_size', '_limit_by_side', '_market_by_side'
     )
     
-    def __init__(self):
-        """Initialize a new matching engine."""
+    def __init__(self, tick_size: Optional[float] = None, min_price: Optional[float] = None,
+                 max_price: Optional[float] = None):
+        """
+        Initialize a new matching engine.
+        
+        Args:
+            tick_size: Optional fixed tick size for the order book (see OrderBook)
+            min_price: Lowest price on the tick grid
+            max_price: Highest price on the tick grid
+        """
         # Core components
-        self.order_book = OrderBook()
+        self.order_book = OrderBook(tick_size, min_price, max_price)
         self.statistics = PriceStatisticsCalculator(self.order_book)
         self.trade_executor = TradeExecutor()
         
@@ -41,6 +51,10 @@ class MatchingEngine:
         self.matcher = Matcher(self.order_book, self.trade_executor)
         self.order_processor = OrderProcessor(self.matcher)
         
+        # The processor's per-side submit functions, called without going through it
+        self._limit_by_side = self.order_processor._limit_by_side
+        self._market_by_side = self.order_processor._market_by_side
+        
         # Trade object pool for memory management
         self._trade_pool = []
         self._max_trade_pool_size = 10000
@@ -69,8 +83,11 @@ class MatchingEngine:
             
         Returns:
             The order ID
+            
+        Raises:
+            ValueError: If the order book has a tick grid and the price is not on it
         """
-        return self.order_processor.create_limit_order(side, price, quantity, timestamp, symbol)
+        return self._limit_by_side[side](price, quantity, timestamp, symbol)
     
     def add_market_order(self, side: OrderSide, quantity: float,
                         timestamp: Optional[int] = None, symbol: Optional[str] = None) -> int:
@@ -86,7 +103,7 @@ class MatchingEngine:
         Returns:
             The order ID
         """
-        return self.order_processor.create_market_order(side, quantity, timestamp, symbol)
+        return self._market_by_side[side](quantity, timestamp, symbol)
     
     def batch_add_orders(self, orders: List[Tuple[OrderSide, OrderType, Optional[float], float, Optional[int], Optional[str]]]) -> List[int]:
         """
@@ -100,6 +117,23 @@ class MatchingEngine:
         """
         return self.order_processor.batch_create_orders(orders)
     
+    def batch_add_orders_np(self, sides: np.ndarray, order_types: np.ndarray, prices: np.ndarray,
+                            quantities: np.ndarray, timestamps: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Process a batch of orders given as column arrays, in array order.
+        
+        Args:
+            sides: OrderSide values for each order
+            order_types: OrderType values for each order
+            prices: Limit prices (ignored for market orders)
+            quantities: Order quantities
+            timestamps: Optional timestamps (milliseconds since epoch), default now
+        
+        Returns:
+            int64 array of the order IDs created
+        """
+        return self.order_processor.batch_create_orders_np(sides, order_types, prices, quantities, timestamps)
+    
     def cancel_order(self, order_id: int) -> bool:
         """
         Cancel an order by its ID.
@@ -112,6 +146,18 @@ class MatchingEngine:
         """
         return self.order_processor.cancel_order(order_id)
     
+    def cancel_orders(self, order_ids: List[int]) -> List[bool]:
+        """
+        Cancel a batch of orders by their IDs.
+        
+        Args:
+            order_ids: The IDs of the orders to cancel
+            
+        Returns:
+            For each ID, True if the order was cancelled, False otherwise
+        """
+        return self.order_processor.cancel_orders(order_ids)
+    
     def get_order_book_snapshot(self) -> Dict[str, Any]:
         """
         Get a complete snapshot of the current order book state.
@@ -142,14 +188,29 @@ class MatchingEngine:
         """
         return self.trade_executor.get_trades(clear=True)
     
+    def get_trade_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Get the retained trade history as NumPy columns, without clearing it.
+        
+        Returns:
+            Dictionary of trade_id, buy_order_id, sell_order_id, price, quantity and
+            timestamp arrays
+        """
+        return self.trade_executor.get_trade_arrays()
+    
+    def get_trade_count(self) -> int:
+        """
+        Get the number of trades executed so far.
+        
+        Unlike the retained history, this is not capped or reset by get_trades.
+        """
+        return self.trade_executor.next_trade_id - 1
+    
     def clear_caches(self) -> None:
         """
         Clear internal caches to free memory.
         This should be called periodically in high-throughput systems.
         """
-        # Reset order book caches
-        self.order_book.clear_caches()
-        
         # Clear trade recycling pool
         self._trade_pool.clear()
         
@@ -194,7 +255,4 @@ class MatchingEngine:
         # Add order processor stats
         stats["memory_pools"].update(self.order_processor.get_order_pool_stats())
         
-        # Add cache stats from order book
-        stats["cache_stats"] = self.order_book.get_cache_stats()
-        
         return stats 
\ No newline at end of file
@@ -1,20 +1,24 @@
 """
 Enum definitions for the matching engine.
+
+The enums are IntEnums: members hash and compare as their int values in C, which
+matters when they key per-side dispatch tables on every order. Values are stable
+and shared with the array batch APIs and the Rust engine.
 """
-from enum import Enum
+from enum import IntEnum
 
 
-class OrderSide(Enum):
+class OrderSide(IntEnum):
     BUY = 1
     SELL = 2
 
 
-class OrderType(Enum):
+class OrderType(IntEnum):
     MARKET = 1
     LIMIT = 2
 
 
-class OrderStatus(Enum):
+class OrderStatus(IntEnum):
     NEW = 1
     PARTIALLY_FILLED = 2
     FILLED = 3
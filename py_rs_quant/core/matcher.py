@@ -2,15 +2,17 @@
 Core order matching logic for the matching engine.
 """
 import logging
+from threading import get_ident
 
 from py_rs_quant.core.enums import OrderType, OrderStatus
-from py_rs_quant.core.models import Order, PriceLevel
-from py_rs_quant.core.utils import (
-    min_quantity, update_quantities, update_order_status
-)
+from py_rs_quant.core.models import Order
 
 logger = logging.getLogger(__name__)
 
+_LIMIT = OrderType.LIMIT
+_PARTIALLY_FILLED = OrderStatus.PARTIALLY_FILLED
+_FILLED = OrderStatus.FILLED
+
 
 class Matcher:
     """
@@ -39,137 +41,115 @@ class Matcher:
         Args:
             order: The buy order to match
         """
+        order_book = self.order_book
+        price_level = order_book.best_sell
+        is_limit = order.order_type == _LIMIT
+        
+        # The limit is compared against level keys directly (float prices or int ticks)
+        limit_key = order_book._price_to_key(order.price, False) if is_limit else None
+        
+        # A limit order that crosses nothing (the common case) rests straight away
+        if is_limit and (price_level is None or price_level.price > limit_key):
+            if order.remaining_quantity > 0:
+                order_book.add_buy(order)
+            return
+        
         # Direct access to avoid attribute lookups
-        sell_price_levels = self.order_book.sell_price_levels
+        sell_price_levels = order_book.sell_price_levels
+        orders_by_id = order_book.orders_by_id
+        key_to_price = order_book._key_to_price
+        remove_level = order_book._remove_level
+        execute_trade = self.trade_executor.execute_trade
+        partially_filled = _PARTIALLY_FILLED
+        filled = _FILLED
         order_remaining = order.remaining_quantity
-        order_price = order.price
+        order_filled = order.filled_quantity
+        traded = False
         
-        # Match against existing sell orders
-        if sell_price_levels:
-            # Direct iteration over dictionary keys instead of creating a list
-            for price in sell_price_levels:
-                if order_remaining <= 0:
-                    break
-                    
-                if order.order_type == OrderType.LIMIT and price > order_price:
-                    break
-                    
-                price_level = sell_price_levels.get(price)
-                if not price_level or not price_level.orders:
-                    continue
-                
-                # Match without further function calls
-                price_level_orders = price_level.orders
-                match_price = price
-                
-                # Pre-check the orders to avoid unnecessary processing
-                if not price_level_orders:
-                    continue
-                
-                i = 0
-                while i < len(price_level_orders):
-                    resting_order = price_level_orders[i]
-                    resting_remaining = resting_order.remaining_quantity
-                    
-                    if resting_remaining <= 0:
-                        # Remove empty orders inline instead of accumulating them
-                        price_level_orders.pop(i)
-                        price_level.is_dirty = True
-                        
-                        # Remove from lookups directly
-                        order_id = resting_order.id
-                        orders_by_id = self.order_book.orders_by_id
-                        price_map = self.order_book.order_price_map
-                        if order_id in orders_by_id:
-                            del orders_by_id[order_id]
-                        if order_id in price_map:
-                            del price_map[order_id]
-                        continue
-                        
+        # Match against existing sell orders, always at the best price level
+        if price_level is not None:
+            order_book._version += 1  # Odd while fills change resting quantities in place
+            order_book._fill_thread = get_ident()  # Lets trade callbacks read the book
+            try:
+                while price_level is not None:
                     if order_remaining <= 0:
                         break
                         
-                    # Calculate match quantity using numba-optimized function
-                    match_quantity = min_quantity(order_remaining, resting_remaining)
-                    
-                    # Update order quantities using numba-optimized function
-                    order.filled_quantity, order_remaining = update_quantities(
-                        order.filled_quantity, order_remaining, match_quantity)
-                    order.remaining_quantity = order_remaining
-                    
-                    resting_order.filled_quantity, resting_order.remaining_quantity = update_quantities(
-                        resting_order.filled_quantity, resting_remaining, match_quantity)
-                    
-                    # Set status using numba-optimized function
-                    order.status = update_order_status(
-                        order_remaining, OrderStatus.PARTIALLY_FILLED, OrderStatus.FILLED)
-                    resting_order.status = update_order_status(
-                        resting_order.remaining_quantity, OrderStatus.PARTIALLY_FILLED, OrderStatus.FILLED)
+                    key = price_level.price
+                    if is_limit and key > limit_key:
+                        break
                     
-                    # Execute trade using optimized trade executor
-                    self.trade_executor.execute_trade(
-                        buy_order=order,
-                        sell_order=resting_order,
-                        price=match_price,
-                        quantity=match_quantity
-                    )
+                    # Match without further function calls, always against the queue head
+                    match_price = key_to_price(key, False)
                     
-                    # Remove if fully matched, otherwise move to next
-                    if resting_order.remaining_quantity <= 0:
-                        price_level_orders.pop(i)
-                        price_level.is_dirty = True
+                    resting_order = price_level.head
+                    while resting_order is not None:
+                        resting_remaining = resting_order.remaining_quantity
+                        
+                        if resting_remaining > 0:
+                            # Plain float arithmetic: calling a compiled helper costs far more
+                            # per fill (argument unboxing, result boxing) than the arithmetic
+                            match_quantity = (order_remaining if order_remaining < resting_remaining
+                                              else resting_remaining)
+                            order_remaining -= match_quantity
+                            order_filled += match_quantity
+                            traded = True
+                            
+                            resting_remaining -= match_quantity
+                            resting_order.filled_quantity += match_quantity
+                            resting_order.remaining_quantity = resting_remaining
+                            price_level.total_qty -= match_quantity
+                            
+                            # Set status inline: passing enum members into a compiled
+                            # function makes numba type them on every call
+                            resting_order.status = filled if resting_remaining <= 0 else partially_filled
+                            
+                            # Execute trade using optimized trade executor (positional args)
+                            execute_trade(order, resting_order, match_price, match_quantity)
+                            
+                            # A partially filled resting order stays at the head
+                            if resting_remaining > 0:
+                                break
+                        
+                        # Pop the filled (or empty) head order inline
+                        next_order = resting_order.next_order
+                        price_level.head = next_order
+                        if next_order is None:
+                            price_level.tail = None
+                        else:
+                            next_order.prev_order = None
+                            resting_order.next_order = None
+                        price_level.count -= 1
                         
-                        # Remove from lookups directly
-                        order_id = resting_order.id
-                        orders_by_id = self.order_book.orders_by_id
-                        price_map = self.order_book.order_price_map
-                        if order_id in orders_by_id:
-                            del orders_by_id[order_id]
-                        if order_id in price_map:
-                            del price_map[order_id]
-                    else:
-                        i += 1
+                        # Remove from the order lookup directly
+                        orders_by_id.pop(resting_order.id, None)
+                        
+                        # Break if active order is fully matched
+                        if order_remaining <= 0:
+                            break
+                        resting_order = next_order
                     
-                    # Break if active order is fully matched
-                    if order_remaining <= 0:
-                        break
-                
-                # Remove empty price level
-                if not price_level_orders:
-                    del sell_price_levels[price]
-                    # Remove from cache if present
-                    cache = self.order_book._price_level_cache
-                    cache_key = (id(sell_price_levels), price)
-                    if cache_key in cache:
-                        del cache[cache_key]
-        
-        # If limit order and not fully filled, add to book
-        if order.order_type == OrderType.LIMIT and order_remaining > 0:
-            # Add directly to avoid function call overhead
-            order_book = self.order_book
-            neg_price = -order_price  # Negate for buy orders
-            
-            # Add to lookup dictionaries
-            order_book.orders_by_id[order.id] = order
-            order_book.order_price_map[order.id] = neg_price
-            
-            # Get or create price level
-            price_dict = order_book.buy_price_levels
-            if neg_price in price_dict:
-                price_level = price_dict[neg_price]
-            else:
-                price_level = PriceLevel(neg_price)
-                price_dict[neg_price] = price_level
-                
-                # Add to cache if space available
-                cache = order_book._price_level_cache
-                if len(cache) < order_book._max_cache_size:
-                    cache_key = (id(price_dict), neg_price)
-                    cache[cache_key] = price_level
-            
-            # Add to price level
-            price_level.orders.append(order)
-            price_level.total_qty_cache += order_remaining
+                    # Remove empty price level and move on to the next best
+                    if price_level.head is None:
+                        next_level = price_level.next_level
+                        del sell_price_levels[key]
+                        remove_level(price_level, False)
+                        price_level = next_level
+            finally:
+                # The incoming order's fill state is stored once, after all of its fills
+                # (flagged rather than compared: a tiny fill can leave remaining
+                # unchanged); even if a trade callback raised, the fills so far stand
+                # and the version is made even again so readers don't wait forever
+                if traded:
+                    order.filled_quantity = order_filled
+                    order.remaining_quantity = order_remaining
+                    order.status = filled if order_remaining <= 0 else partially_filled
+                order_book._fill_thread = None
+                order_book._version += 1
+    
+        # If limit order and not fully filled, rest it on the buy side
+        if is_limit and order_remaining > 0:
+            order_book.add_buy(order)
     
     def match_sell_order(self, order: Order) -> None:
         """
@@ -179,137 +159,115 @@ class Matcher:
         Args:
             order: The sell order to match
         """
+        order_book = self.order_book
+        price_level = order_book.best_buy
+        is_limit = order.order_type == _LIMIT
+        
+        # Buy keys are negated, so "bid below our limit" is "key above the limit key"
+        limit_key = order_book._price_to_key(order.price, True) if is_limit else None
+        
+        # A limit order that crosses nothing (the common case) rests straight away
+        if is_limit and (price_level is None or price_level.price > limit_key):
+            if order.remaining_quantity > 0:
+                order_book.add_sell(order)
+            return
+        
         # Direct access to avoid attribute lookups
-        buy_price_levels = self.order_book.buy_price_levels  
+        buy_price_levels = order_book.buy_price_levels
+        orders_by_id = order_book.orders_by_id
+        key_to_price = order_book._key_to_price
+        remove_level = order_book._remove_level
+        execute_trade = self.trade_executor.execute_trade
+        partially_filled = _PARTIALLY_FILLED
+        filled = _FILLED
         order_remaining = order.remaining_quantity
-        order_price = order.price
+        order_filled = order.filled_quantity
+        traded = False
         
-        # Match against existing buy orders
-        if buy_price_levels:
-            # Direct iteration over dictionary keys instead of creating a list
-            for neg_price in buy_price_levels:
-                if order_remaining <= 0:
-                    break
-                
-                price = -neg_price  # Convert back to positive price
-                if order.order_type == OrderType.LIMIT and price < order_price:
-                    break
-                
-                price_level = buy_price_levels.get(neg_price)
-                if not price_level or not price_level.orders:
-                    continue
-                
-                # Match without further function calls
-                price_level_orders = price_level.orders
-                match_price = price
-                
-                # Pre-check the orders to avoid unnecessary processing
-                if not price_level_orders:
-                    continue
-                
-                i = 0
-                while i < len(price_level_orders):
-                    resting_order = price_level_orders[i]
-                    resting_remaining = resting_order.remaining_quantity
-                    
-                    if resting_remaining <= 0:
-                        # Remove empty orders inline instead of accumulating them
-                        price_level_orders.pop(i)
-                        price_level.is_dirty = True
-                        
-                        # Remove from lookups directly
-                        order_id = resting_order.id
-                        orders_by_id = self.order_book.orders_by_id
-                        price_map = self.order_book.order_price_map
-                        if order_id in orders_by_id:
-                            del orders_by_id[order_id]
-                        if order_id in price_map:
-                            del price_map[order_id]
-                        continue
-                        
+        # Match against existing buy orders, always at the best price level
+        if price_level is not None:
+            order_book._version += 1  # Odd while fills change resting quantities in place
+            order_book._fill_thread = get_ident()  # Lets trade callbacks read the book
+            try:
+                while price_level is not None:
                     if order_remaining <= 0:
                         break
-                        
-                    # Calculate match quantity using numba-optimized function
-                    match_quantity = min_quantity(order_remaining, resting_remaining)
-                    
-                    # Update order quantities using numba-optimized function
-                    order.filled_quantity, order_remaining = update_quantities(
-                        order.filled_quantity, order_remaining, match_quantity)
-                    order.remaining_quantity = order_remaining
                     
-                    resting_order.filled_quantity, resting_order.remaining_quantity = update_quantities(
-                        resting_order.filled_quantity, resting_remaining, match_quantity)
-                    
-                    # Set status using numba-optimized function
-                    order.status = update_order_status(
-                        order_remaining, OrderStatus.PARTIALLY_FILLED, OrderStatus.FILLED)
-                    resting_order.status = update_order_status(
-                        resting_order.remaining_quantity, OrderStatus.PARTIALLY_FILLED, OrderStatus.FILLED)
+                    key = price_level.price
+                    if is_limit and key > limit_key:
+                        break
                     
-                    # Execute trade using optimized trade executor
-                    self.trade_executor.execute_trade(
-                        buy_order=resting_order,
-                        sell_order=order,
-                        price=match_price,
-                        quantity=match_quantity
-                    )
+                    # Match without further function calls, always against the queue head
+                    match_price = key_to_price(key, True)
                     
-                    # Remove if fully matched, otherwise move to next
-                    if resting_order.remaining_quantity <= 0:
-                        price_level_orders.pop(i)
-                        price_level.is_dirty = True
+                    resting_order = price_level.head
+                    while resting_order is not None:
+                        resting_remaining = resting_order.remaining_quantity
+                        
+                        if resting_remaining > 0:
+                            # Plain float arithmetic: calling a compiled helper costs far more
+                            # per fill (argument unboxing, result boxing) than the arithmetic
+                            match_quantity = (order_remaining if order_remaining < resting_remaining
+                                              else resting_remaining)
+                            order_remaining -= match_quantity
+                            order_filled += match_quantity
+                            traded = True
+                            
+                            resting_remaining -= match_quantity
+                            resting_order.filled_quantity += match_quantity
+                            resting_order.remaining_quantity = resting_remaining
+                            price_level.total_qty -= match_quantity
+                            
+                            # Set status inline: passing enum members into a compiled
+                            # function makes numba type them on every call
+                            resting_order.status = filled if resting_remaining <= 0 else partially_filled
+                            
+                            # Execute trade using optimized trade executor (positional args)
+                            execute_trade(resting_order, order, match_price, match_quantity)
+                            
+                            # A partially filled resting order stays at the head
+                            if resting_remaining > 0:
+                                break
+                        
+                        # Pop the filled (or empty) head order inline
+                        next_order = resting_order.next_order
+                        price_level.head = next_order
+                        if next_order is None:
+                            price_level.tail = None
+                        else:
+                            next_order.prev_order = None
+                            resting_order.next_order = None
+                        price_level.count -= 1
+                        
+                        # Remove from the order lookup directly
+                        orders_by_id.pop(resting_order.id, None)
                         
-                        # Remove from lookups directly
-                        order_id = resting_order.id
-                        orders_by_id = self.order_book.orders_by_id
-                        price_map = self.order_book.order_price_map
-                        if order_id in orders_by_id:
-                            del orders_by_id[order_id]
-                        if order_id in price_map:
-                            del price_map[order_id]
-                    else:
-                        i += 1
+                        # Break if active order is fully matched
+                        if order_remaining <= 0:
+                            break
+                        resting_order = next_order
                     
-                    # Break if active order is fully matched
-                    if order_remaining <= 0:
-                        break
-                
-                # Remove empty price level
-                if not price_level_orders:
-                    del buy_price_levels[neg_price]
-                    # Remove from cache if present
-                    cache = self.order_book._price_level_cache
-                    cache_key = (id(buy_price_levels), neg_price)
-                    if cache_key in cache:
-                        del cache[cache_key]
-        
-        # If limit order and not fully filled, add to book
-        if order.order_type == OrderType.LIMIT and order_remaining > 0:
-            # Add directly to avoid function call overhead
-            order_book = self.order_book
-            
-            # Add to lookup dictionaries
-            order_book.orders_by_id[order.id] = order
-            order_book.order_price_map[order.id] = order_price
-            
-            # Get or create price level
-            price_dict = order_book.sell_price_levels
-            if order_price in price_dict:
-                price_level = price_dict[order_price]
-            else:
-                price_level = PriceLevel(order_price)
-                price_dict[order_price] = price_level
-                
-                # Add to cache if space available
-                cache = order_book._price_level_cache
-                if len(cache) < order_book._max_cache_size:
-                    cache_key = (id(price_dict), order_price)
-                    cache[cache_key] = price_level
-            
-            # Add to price level
-            price_level.orders.append(order)
-            price_level.total_qty_cache += order_remaining
+                    # Remove empty price level and move on to the next best
+                    if price_level.head is None:
+                        next_level = price_level.next_level
+                        del buy_price_levels[key]
+                        remove_level(price_level, True)
+                        price_level = next_level
+            finally:
+                # The incoming order's fill state is stored once, after all of its fills
+                # (flagged rather than compared: a tiny fill can leave remaining
+                # unchanged); even if a trade callback raised, the fills so far stand
+                # and the version is made even again so readers don't wait forever
+                if traded:
+                    order.filled_quantity = order_filled
+                    order.remaining_quantity = order_remaining
+                    order.status = filled if order_remaining <= 0 else partially_filled
+                order_book._fill_thread = None
+                order_book._version += 1
+    
+        # If limit order and not fully filled, rest it on the sell side
+        if is_limit and order_remaining > 0:
+            order_book.add_sell(order)
     
     def clear_caches(self) -> None:
         """
@@ -1,17 +1,33 @@
 """
 Data models for the matching engine.
 """
-from typing import Optional, List
+from typing import Iterator, Optional, List, Tuple
+
+import numpy as np
 
 from py_rs_quant.core.enums import OrderSide, OrderType, OrderStatus
 
+# Bound once: Enum class attribute access is slow enough to show per order
+_BUY = OrderSide.BUY
+_NEW = OrderStatus.NEW
+
+# One packed row per order for bulk export: enums are stored by value
+ORDER_DTYPE = np.dtype([
+    ('id', np.int64), ('price', np.float64), ('quantity', np.float64),
+    ('filled', np.float64), ('remaining', np.float64), ('timestamp', np.int64),
+    ('status', np.uint8), ('side', np.uint8), ('order_type', np.uint8),
+])
+
 class Order:
     """Order model representing a buy or sell order in the order book."""
-    # Ordered for cache line efficiency: frequently accessed fields first
+    # Grouped by how often the matching loop touches them. CPython assigns slot
+    # offsets in sorted name order, so this documents access, not memory layout.
     __slots__ = [
-        'id', 'remaining_quantity', 'price', 'side',  # Most frequently accessed
-        'filled_quantity', 'quantity', 'status',      # Moderate access frequency
-        'order_type', 'timestamp', 'symbol'           # Less frequently accessed
+        'remaining_quantity', 'filled_quantity', 'status',  # Updated on every fill
+        'id', 'next_order', 'prev_order',                   # Queue walk and unlink
+        'sort_key',                                         # Book add and remove
+        'price', 'side', 'order_type',                      # Read on entry to matching
+        'quantity', 'timestamp', 'symbol'                   # Not read while matching
     ]
     
     def __init__(self, 
@@ -28,17 +44,25 @@ class Order:
         self.remaining_quantity = quantity
         self.price = price
         self.side = side
+        # Price level key, negated for buys so the best price sorts first (None for
+        # market orders). On a tick grid the book replaces it with the int tick key.
+        # The book finds a resting order's level through it on cancel.
+        self.sort_key = (-price if side == _BUY else price) if price is not None else None
         
         # Moderate access frequency
         self.filled_quantity = 0.0
         self.quantity = quantity
-        self.status = OrderStatus.NEW
+        self.status = _NEW
         
         # Less frequently accessed
         self.order_type = order_type
         self.timestamp = timestamp
         self.symbol = symbol
         
+        # Neighbours in the price level queue, set while the order rests in the book
+        self.prev_order: Optional['Order'] = None
+        self.next_order: Optional['Order'] = None
+        
     def __repr__(self) -> str:
         """String representation for debugging."""
         return (f"Order(id={self.id}, side={self.side.name}, type={self.order_type.name}, "
@@ -48,7 +72,7 @@ class Order:
 
 class Trade:
     """Trade model representing an executed trade between two orders."""
-    # Ordered for cache line efficiency
+    # Grouped by access frequency (offsets follow sorted slot names in CPython)
     __slots__ = [
         'trade_id', 'buy_order_id', 'sell_order_id',  # IDs are accessed most
         'price', 'quantity',                          # Trade details
@@ -84,50 +108,128 @@ class Trade:
 
 
 class PriceLevel:
-    """Price level model representing all orders at a specific price."""
-    # Optimize field order for cache efficiency
+    """
+    Price level model representing all orders at a specific price.
+    
+    Orders form an intrusive doubly-linked FIFO queue (oldest at head), so appending
+    and unlinking a known order are O(1) and cancellation never scans the level.
+    Levels themselves are linked best-first within their side of the book.
+    """
+    # Grouped by matching loop access (offsets follow sorted slot names in CPython)
     __slots__ = [
-        'price', 'orders', 'total_qty_cache', 'is_dirty'
+        'head', 'total_qty', 'price', 'next_level',  # Read or updated on every fill
+        'count', 'tail', 'prev_level'                # Queue and level list maintenance
     ]
     
     def __init__(self, price: float):
         """Initialize a price level."""
         self.price = price
-        self.orders: List[Order] = []
-        self.total_qty_cache: float = 0.0
-        self.is_dirty: bool = False
+        self.head: Optional[Order] = None
+        self.tail: Optional[Order] = None
+        self.count: int = 0
+        self.total_qty: float = 0.0  # Maintained on every add, cancel and fill
+        
+        # Neighbouring levels on the same side, best price first
+        self.prev_level: Optional['PriceLevel'] = None
+        self.next_level: Optional['PriceLevel'] = None
+    
+    def link(self, order: Order) -> None:
+        """Append an order to the back of the queue without touching the total quantity."""
+        tail = self.tail
+        order.prev_order = tail
+        order.next_order = None
+        if tail is None:
+            self.head = order
+        else:
+            tail.next_order = order
+        self.tail = order
+        self.count += 1
+    
+    def unlink(self, order: Order) -> None:
+        """Remove an order known to be at this level from the queue in O(1)."""
+        prev_order = order.prev_order
+        next_order = order.next_order
+        if prev_order is None:
+            self.head = next_order
+        else:
+            prev_order.next_order = next_order
+        if next_order is None:
+            self.tail = prev_order
+        else:
+            next_order.prev_order = prev_order
+        order.prev_order = None
+        order.next_order = None
+        self.count -= 1
         
     def add_order(self, order: Order) -> None:
         """Add an order to this price level."""
-        self.orders.append(order)
-        self.total_qty_cache += order.remaining_quantity
+        self.link(order)
+        self.total_qty += order.remaining_quantity
         
     def remove_order(self, order_id: int) -> bool:
         """Remove an order from this price level."""
-        for i, order in enumerate(self.orders):
+        order = self.head
+        while order is not None:
             if order.id == order_id:
-                removed = self.orders.pop(i)
-                self.is_dirty = True  # Mark for total quantity recalculation
+                self.unlink(order)
+                self.total_qty -= order.remaining_quantity
                 return True
+            order = order.next_order
         return False
     
+    def __iter__(self) -> Iterator[Order]:
+        """Iterate the queue in time priority without building a list."""
+        order = self.head
+        while order is not None:
+            next_order = order.next_order  # Read first, so the order may be unlinked
+            yield order
+            order = next_order
+    
+    @property
+    def orders(self) -> List[Order]:
+        """Orders at this price level in time priority."""
+        return list(self)
+    
+    def to_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Export the queue as struct-of-arrays: (order_ids int64, remaining float64),
+        in time priority, filled in a single pass over the queue.
+        """
+        count = self.count
+        order_ids = np.empty(count, dtype=np.int64)
+        remaining = np.empty(count, dtype=np.float64)
+        order = self.head
+        i = 0
+        while order is not None:
+            order_ids[i] = order.id
+            remaining[i] = order.remaining_quantity
+            order = order.next_order
+            i += 1
+        return order_ids, remaining
+    
+    def to_records(self) -> List[tuple]:
+        """Rows of the queue in time priority, shaped for ORDER_DTYPE."""
+        rows = []
+        order = self.head
+        while order is not None:
+            rows.append((order.id, order.price, order.quantity, order.filled_quantity,
+                         order.remaining_quantity, order.timestamp, order.status.value,
+                         order.side.value, order.order_type.value))
+            order = order.next_order
+        return rows
+    
     def get_total_quantity(self) -> float:
         """Get the total quantity of all orders at this price level."""
-        if self.is_dirty:
-            # Recalculate the total quantity
-            self.total_qty_cache = sum(order.remaining_quantity for order in self.orders)
-            self.is_dirty = False
-        return self.total_qty_cache
+        return self.total_qty
     
     def __len__(self) -> int:
         """Number of orders at this price level."""
-        return len(self.orders)
+        return self.count
     
     def __bool__(self) -> bool:
         """Check if there are any orders at this price level."""
-        return bool(self.orders)
+        return self.head is not None
     
     def __repr__(self) -> str:
         """String representation for debugging."""
-        return f"PriceLevel(price={self.price}, orders={len(self.orders)}, qty={self.get_total_quantity()})"
-
+        return f"PriceLevel(price={self.price}, orders={self.count}, qty={self.total_qty})"
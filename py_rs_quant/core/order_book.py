@@ -1,13 +1,17 @@
 """
 Order book implementation for the matching engine.
 """
-from typing import Dict, List, Optional, Tuple, Any
-from sortedcontainers import SortedDict
+from typing import Callable, Dict, List, Optional, Tuple, Any
+from decimal import Decimal
+import numpy as np
 import logging
+import math
 import time
+from threading import get_ident
 
-from py_rs_quant.core.enums import OrderSide
-from py_rs_quant.core.models import Order, PriceLevel
+from py_rs_quant.core.enums import OrderSide, OrderType
+from py_rs_quant.core.models import ORDER_DTYPE, Order, PriceLevel
+from py_rs_quant.core.utils import gc_paused, group_price_levels, summarize_levels
 
 logger = logging.getLogger(__name__)
 
@@ -21,27 +25,150 @@ class OrderBook:
     """
     
     __slots__ = (
-        'buy_price_levels', 'sell_price_levels', 'orders_by_id', 
-        'order_price_map', '_price_level_cache', '_cache_hits', 
-        '_cache_misses', '_max_cache_size'
+        'buy_price_levels', 'sell_price_levels', 'best_buy', 'best_sell', '_worst_buy', '_worst_sell',
+        'orders_by_id', '_buy_snap_buf', '_sell_snap_buf',
+        'add_buy', 'add_sell', '_remove_buy', '_remove_sell',
+        '_levels_by_side', '_add_by_side', '_remove_by_side',
+        'tick_size', '_price_scale', '_tick_units', '_min_tick', '_num_ticks',
+        '_buy_tick_levels', '_sell_tick_levels', '_buy_tick_bits', '_sell_tick_bits',
+        '_version', '_fill_thread', '_snapshot_cache', '_levels_cache'
     )
     
-    def __init__(self):
-        # Use SortedDict for more efficient order book operations
+    def __init__(self, tick_size: Optional[float] = None, min_price: Optional[float] = None,
+                 max_price: Optional[float] = None):
+        """
+        Initialize an order book.
+        
+        Args:
+            tick_size: Optional tick size. When given together with min_price and
+                max_price, prices must lie on that fixed grid, levels are keyed by
+                integer tick and new levels are placed by tick index instead of
+                walking the level list. Prices are converted back to floats only
+                at the API boundary.
+            min_price: Lowest price on the tick grid
+            max_price: Highest price on the tick grid
+        """
+        # Price levels are plain dicts indexed by price key for O(1) lookup, and are
+        # also linked in ascending key order (best price first) via prev/next_level.
+        # Keys are float prices, or int ticks on a tick grid.
         # For buy orders (highest price first), we'll use negative price as the key
-        self.buy_price_levels = SortedDict()  # key: -price, value: PriceLevel
+        self.buy_price_levels: Dict[float, PriceLevel] = {}  # key: -price, value: PriceLevel
+        self.best_buy: Optional[PriceLevel] = None  # head of the buy level list
+        self._worst_buy: Optional[PriceLevel] = None  # tail of the buy level list
         # For sell orders (lowest price first)
-        self.sell_price_levels = SortedDict()  # key: price, value: PriceLevel
+        self.sell_price_levels: Dict[float, PriceLevel] = {}  # key: price, value: PriceLevel
+        self.best_sell: Optional[PriceLevel] = None
+        self._worst_sell: Optional[PriceLevel] = None
         
         # Lookups for faster access to orders
         self.orders_by_id = {}  # Dict mapping order_id to Order
-        self.order_price_map = {}  # Dict mapping order_id to price for faster cancellation
+        # A resting order's level key is its sort_key, so no separate id -> price map
+        
+        # Reusable (N, 2) snapshot buffers, one per side, grown geometrically
+        self._buy_snap_buf = np.empty((64, 2), dtype=np.float64)
+        self._sell_snap_buf = np.empty((64, 2), dtype=np.float64)
+        
+        # Optional fixed tick grid: per side, the level at each tick plus a bitset of
+        # occupied ticks (a Python int) to find the neighbouring level of a new one.
+        # Ticks are exact integers: price = tick * _tick_units / _price_scale.
+        self.tick_size = tick_size
+        if tick_size is not None:
+            if min_price is None or max_price is None or tick_size <= 0 or max_price < min_price:
+                raise ValueError("tick_size requires a valid min_price/max_price range")
+            decimals = max(0, -Decimal(repr(tick_size)).normalize().as_tuple().exponent)
+            self._price_scale = 10 ** decimals
+            self._tick_units = int(round(tick_size * self._price_scale))
+            self._min_tick = int(round(min_price * self._price_scale / self._tick_units))
+            max_tick = int(round(max_price * self._price_scale / self._tick_units))
+            self._num_ticks = max_tick - self._min_tick + 1
+            self._buy_tick_levels: List[Optional[PriceLevel]] = [None] * self._num_ticks
+            self._sell_tick_levels: List[Optional[PriceLevel]] = [None] * self._num_ticks
+        else:
+            self._price_scale = self._tick_units = 1
+            self._min_tick = self._num_ticks = 0
+            self._buy_tick_levels = self._sell_tick_levels = None
+        self._buy_tick_bits = 0
+        self._sell_tick_bits = 0
+        
+        # Sequence counter, seqlock style: bumped at the start and end of every
+        # mutation (including fills by the matcher), so it is odd while a write is in
+        # progress. Snapshots are memoized between mutations as (version, result),
+        # and readers on other threads use it to detect a torn read.
+        self._version = 0
+        # Ident of the thread inside the matcher's fill loop, whose trade callbacks
+        # may read the book mid-write
+        self._fill_thread: Optional[int] = None
+        self._snapshot_cache: Optional[Tuple[int, Dict[str, Any]]] = None
+        self._levels_cache: Optional[Tuple[int, Tuple[List, List]]] = None
+        
+        # Side-specialized add/remove functions, so callers that know the side
+        # (like the matcher) skip the side branch entirely
+        self.add_buy = self._make_add(self.buy_price_levels, True)
+        self.add_sell = self._make_add(self.sell_price_levels, False)
+        self._remove_buy = self._make_remove(self.buy_price_levels, True)
+        self._remove_sell = self._make_remove(self.sell_price_levels, False)
         
-        # Price level caching
-        self._price_level_cache = {}
-        self._cache_hits = 0
-        self._cache_misses = 0
-        self._max_cache_size = 100
+        # Per-side dispatch keyed by OrderSide, in place of side branches. A lookup
+        # on the member is cheaper than comparing against OrderSide.BUY.
+        self._levels_by_side = {OrderSide.BUY: self.buy_price_levels,
+                                OrderSide.SELL: self.sell_price_levels}
+        self._add_by_side = {OrderSide.BUY: self.add_buy, OrderSide.SELL: self.add_sell}
+        self._remove_by_side = {OrderSide.BUY: self._remove_buy, OrderSide.SELL: self._remove_sell}
+    
+    def _make_add(self, price_dict: Dict[float, PriceLevel], is_buy: bool):
+        """Build an add function for one side, with its price dict and key sign bound."""
+        orders_by_id = self.orders_by_id
+        insert_level = self._insert_level
+        to_tick = self.price_to_tick if self.tick_size is not None else None
+        sign = -1 if is_buy else 1  # Negate buy ticks for correct sorting
+        
+        def add(order: Order) -> None:
+            # Orders carry their pre-negated float key; on a tick grid it becomes the tick
+            key = order.sort_key
+            if to_tick is not None:
+                key = order.sort_key = sign * to_tick(order.price)
+            self._version += 1  # Odd until the write completes
+            try:
+                # Single hash probe on the (dominant) existing-level path
+                price_level = price_dict.get(key)
+                if price_level is None:
+                    price_level = PriceLevel(key)
+                    insert_level(price_level, is_buy)  # May reject off-grid prices, so first
+                    price_dict[key] = price_level
+                
+                # Add to price level and lookup maps
+                orders_by_id[order.id] = order
+                price_level.link(order)
+                price_level.total_qty += order.remaining_quantity
+            finally:
+                self._version += 1
+        
+        return add
+    
+    def _make_remove(self, price_dict: Dict[float, PriceLevel], is_buy: bool):
+        """
+        Build a remove function for one side, taking an order resting on that side
+        that the caller has already popped from orders_by_id. The caller also holds
+        the version odd around the call.
+        """
+        remove_level = self._remove_level
+        
+        def remove(order: Order) -> Order:
+            # A resting order's sort_key is its level key, and its level always exists
+            key = order.sort_key
+            price_level = price_dict[key]
+            
+            # Unlink directly from the level queue, no scan needed
+            price_level.unlink(order)
+            price_level.total_qty -= order.remaining_quantity
+            
+            # Clean up empty price levels
+            if price_level.head is None:
+                del price_dict[key]
+                remove_level(price_level, is_buy)
+            return order
+        
+        return remove
     
     def add_order(self, order: Order) -> None:
         """
@@ -50,52 +177,232 @@ class OrderBook:
         Args:
             order: The order to add
         """
-        # Add to lookup maps
-        self.orders_by_id[order.id] = order
-        
-        if order.side == OrderSide.BUY:
-            neg_price = -order.price  # Negate for correct sorting (highest price first)
-            price_dict = self.buy_price_levels
-            
-            # Direct dictionary lookup with conditional price level creation
-            if neg_price in price_dict:
-                price_level = price_dict[neg_price]
+        self._add_by_side[order.side](order)
+
+    def add_orders_batch(self, prices: np.ndarray, qtys: np.ndarray, sides: np.ndarray,
+                         ids: np.ndarray, tss: np.ndarray) -> None:
+        """
+        Add a batch of resting limit orders to the book.
+
+        Orders are not matched against each other or the book; this is intended for
+        loading book state (backtest replays, fuzz tests). Grouping by price level and
+        level totals are computed in a compiled kernel, the price level structures are
+        then updated in a single pass with the cyclic garbage collector paused.
+
+        Args:
+            prices: Limit prices
+            qtys: Order quantities
+            sides: OrderSide values for each order
+            ids: Order IDs
+            tss: Order timestamps (milliseconds since epoch)
+
+        Raises:
+            ValueError: If sides holds a value other than BUY or SELL, or a price is
+                off the tick grid; the book is left unchanged
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        qtys = np.asarray(qtys, dtype=np.float64)
+        sides = np.asarray(sides)
+        ids = np.asarray(ids, dtype=np.int64)
+        tss = np.asarray(tss, dtype=np.int64)
+
+        is_buy = sides == OrderSide.BUY.value
+        is_sell = sides == OrderSide.SELL.value
+        if not (is_buy | is_sell).all():
+            raise ValueError("sides must hold OrderSide values")
+
+        # Both sides' keys are computed (and off-grid prices rejected) before the book
+        # is touched, so a bad batch leaves it unchanged
+        batches = []
+        for side, side_is_buy, mask, sign, price_dict in (
+            (OrderSide.BUY, True, is_buy, -1.0, self.buy_price_levels),
+            (OrderSide.SELL, False, is_sell, 1.0, self.sell_price_levels),
+        ):
+            idx = np.flatnonzero(mask)
+            if len(idx) == 0:
+                continue
+            if self.tick_size is None:
+                keys = prices[idx] * sign
             else:
-                # Create new price level
-                price_level = PriceLevel(neg_price)
-                price_dict[neg_price] = price_level
-                
-                # Cache for frequently accessed price levels
-                cache_key = (id(price_dict), neg_price)
-                if len(self._price_level_cache) < self._max_cache_size:
-                    self._price_level_cache[cache_key] = price_level
-            
-            # Add to price level and price map
-            price_level.orders.append(order)
-            price_level.total_qty_cache += order.remaining_quantity
-            self.order_price_map[order.id] = neg_price
-        else:  # SELL order
-            price = order.price
-            price_dict = self.sell_price_levels
-            
-            # Direct dictionary lookup with conditional price level creation
-            if price in price_dict:
-                price_level = price_dict[price]
+                keys = self._prices_to_ticks(prices[idx]) * int(sign)
+            batches.append((side, side_is_buy, idx, keys, price_dict))
+
+        orders_by_id = self.orders_by_id
+        insert_level = self._insert_level
+        limit = OrderType.LIMIT
+
+        # Per-order reads go through Python lists, not numpy scalar indexing
+        price_list = prices.tolist()
+        qty_list = qtys.tolist()
+        id_list = ids.tolist()
+        ts_list = tss.tolist()
+
+        self._version += 1  # Odd until the write completes
+        try:
+            with gc_paused():
+                for side, side_is_buy, idx, keys, price_dict in batches:
+                    order, starts, totals = group_price_levels(keys, qtys[idx])
+
+                    # Python objects are only touched once the grouping is done
+                    batch_idx = idx[order].tolist()
+                    batch_keys = keys[order].tolist()
+                    starts = starts.tolist()
+                    totals = totals.tolist()
+
+                    for level in range(len(totals)):
+                        start, end = starts[level], starts[level + 1]
+                        key = batch_keys[start]
+
+                        price_level = price_dict.get(key)
+                        if price_level is None:
+                            price_level = PriceLevel(key)
+                            price_dict[key] = price_level
+                            insert_level(price_level, side_is_buy)
+
+                        link = price_level.link
+                        for i in batch_idx[start:end]:
+                            order_id = id_list[i]
+                            order_obj = Order(order_id, side, limit, price_list[i], qty_list[i], ts_list[i])
+                            order_obj.sort_key = key
+                            link(order_obj)
+                            orders_by_id[order_id] = order_obj
+
+                        price_level.total_qty += totals[level]
+        finally:
+            self._version += 1
+
+    def price_to_tick(self, price: float) -> int:
+        """
+        Get the integer tick of a price on the order book's tick grid.
+        
+        Raises:
+            ValueError: If the price is outside the grid or not a multiple of the tick size
+        """
+        scaled = price * self._price_scale / self._tick_units
+        tick = int(round(scaled))
+        if not 0 <= tick - self._min_tick < self._num_ticks or abs(scaled - tick) > 1e-6:
+            raise ValueError(f"Price {price} is not on the tick grid")
+        return tick
+    
+    def _prices_to_ticks(self, prices: np.ndarray) -> np.ndarray:
+        """Vectorized price_to_tick for a float64 array of prices."""
+        scaled = prices * self._price_scale / self._tick_units
+        ticks = np.rint(scaled).astype(np.int64)
+        offsets = ticks - self._min_tick
+        bad = (offsets < 0) | (offsets >= self._num_ticks) | (np.abs(scaled - ticks) > 1e-6)
+        if bad.any():
+            raise ValueError(f"Price {prices[np.argmax(bad)]} is not on the tick grid")
+        return ticks
+    
+    def _price_to_key(self, price: float, is_buy: bool):
+        """Convert a price to the level key used on one side of the book."""
+        key = self.price_to_tick(price) if self.tick_size is not None else price
+        return -key if is_buy else key
+    
+    def _key_to_price(self, key, is_buy: bool) -> float:
+        """Convert a level key on one side of the book back to a price."""
+        if is_buy:
+            key = -key
+        if self.tick_size is not None:
+            return key * self._tick_units / self._price_scale
+        return key
+    
+    def _keys_to_prices(self, keys: np.ndarray, is_buy: bool) -> np.ndarray:
+        """Vectorized _key_to_price, in place on a float64 array of keys."""
+        if is_buy:
+            keys *= -1
+        if self.tick_size is not None:
+            keys *= self._tick_units
+            keys /= self._price_scale
+        return keys
+    
+    def _insert_level(self, price_level: PriceLevel, is_buy: bool) -> None:
+        """
+        Splice a new price level into its side's level list.
+        
+        New levels almost always land at or near the top of the book, so the insertion
+        point is found by walking from the best level; levels beyond the current worst
+        are appended at the tail directly. On a tick grid the neighbouring level is
+        found from the occupied-tick bitset instead.
+        """
+        if is_buy:
+            best, worst = self.best_buy, self._worst_buy
+        else:
+            best, worst = self.best_sell, self._worst_sell
+        key = price_level.price
+        
+        if self.tick_size is not None:
+            if is_buy:
+                tick = -key - self._min_tick
+                # Next better bid is the lowest occupied tick above this one
+                higher = self._buy_tick_bits >> (tick + 1)
+                prev_level = (self._buy_tick_levels[tick + (higher & -higher).bit_length()]
+                              if higher else None)
+                self._buy_tick_levels[tick] = price_level
+                self._buy_tick_bits |= 1 << tick
             else:
-                # Create new price level
-                price_level = PriceLevel(price)
-                price_dict[price] = price_level
-                
-                # Cache for frequently accessed price levels
-                cache_key = (id(price_dict), price)
-                if len(self._price_level_cache) < self._max_cache_size:
-                    self._price_level_cache[cache_key] = price_level
-            
-            # Add to price level and price map
-            price_level.orders.append(order)
-            price_level.total_qty_cache += order.remaining_quantity
-            self.order_price_map[order.id] = price
+                tick = key - self._min_tick
+                # Next better ask is the highest occupied tick below this one
+                lower = self._sell_tick_bits & ((1 << tick) - 1)
+                prev_level = self._sell_tick_levels[lower.bit_length() - 1] if lower else None
+                self._sell_tick_levels[tick] = price_level
+                self._sell_tick_bits |= 1 << tick
+        elif best is None or key < best.price:
+            prev_level = None
+        elif key > worst.price:
+            prev_level = worst
+        else:
+            prev_level = best
+            while prev_level.next_level.price < key:
+                prev_level = prev_level.next_level
+        
+        # Splice after prev_level, or at the head when there is no better level
+        next_level = best if prev_level is None else prev_level.next_level
+        price_level.prev_level = prev_level
+        price_level.next_level = next_level
+        if prev_level is None:
+            best = price_level
+        else:
+            prev_level.next_level = price_level
+        if next_level is None:
+            worst = price_level
+        else:
+            next_level.prev_level = price_level
+        
+        if is_buy:
+            self.best_buy, self._worst_buy = best, worst
+        else:
+            self.best_sell, self._worst_sell = best, worst
     
+    def _remove_level(self, price_level: PriceLevel, is_buy: bool) -> None:
+        """Unlink a price level from its side's level list in O(1)."""
+        if self.tick_size is not None:
+            if is_buy:
+                tick = -price_level.price - self._min_tick
+                self._buy_tick_levels[tick] = None
+                self._buy_tick_bits &= ~(1 << tick)
+            else:
+                tick = price_level.price - self._min_tick
+                self._sell_tick_levels[tick] = None
+                self._sell_tick_bits &= ~(1 << tick)
+        
+        prev_level = price_level.prev_level
+        next_level = price_level.next_level
+        if prev_level is not None:
+            prev_level.next_level = next_level
+        elif is_buy:
+            self.best_buy = next_level
+        else:
+            self.best_sell = next_level
+        if next_level is not None:
+            next_level.prev_level = prev_level
+        elif is_buy:
+            self._worst_buy = prev_level
+        else:
+            self._worst_sell = prev_level
+        price_level.prev_level = None
+        price_level.next_level = None
+
     def remove_order(self, order_id: int) -> Optional[Order]:
         """
         Remove an order from the book with optimized performance.
@@ -106,70 +413,103 @@ class OrderBook:
         Returns:
             The removed order or None if not found
         """
-        # Fast fail if order doesn't exist
-        if order_id not in self.orders_by_id:
-            return None
-            
-        order = self.orders_by_id[order_id]
-        price = self.order_price_map.get(order_id)
+        # Lookup and removal from the id map in one hash probe, inside the write so
+        # readers never see the order counted on its level but not in the map
+        self._version += 1  # Odd until the write completes
+        try:
+            order = self.orders_by_id.pop(order_id, None)
+            if order is not None:
+                self._remove_by_side[order.side](order)
+        finally:
+            self._version += 1
+        return order
+    
+    def remove_orders(self, order_ids: List[int]) -> List[Optional[Order]]:
+        """
+        Remove a batch of orders from the book.
         
-        if price is None:
-            return None
-            
-        # Select the right price book based on order side
-        if order.side == OrderSide.BUY:
-            price_dict = self.buy_price_levels
-        else:
-            price_dict = self.sell_price_levels
-            
-        cache_key = (id(price_dict), price)
+        Each order is unlinked from its level as it is found; levels emptied by the
+        batch are dropped in a single sweep at the end rather than one by one.
         
-        # Get price level directly from dictionary
-        price_level = price_dict.get(price)
-        if not price_level:
-            return None
-            
-        # Try to remove order from price level
-        removed = False
-        for i, o in enumerate(price_level.orders):
-            if o.id == order_id:
-                price_level.orders.pop(i)
-                price_level.is_dirty = True  # Flag cache as dirty
-                removed = True
-                break
-                
-        if not removed:
-            return None
+        Args:
+            order_ids: IDs of the orders to remove
             
-        # Clean up empty price levels
-        if not price_level.orders:
-            del price_dict[price]
-            if cache_key in self._price_level_cache:
-                del self._price_level_cache[cache_key]
+        Returns:
+            The removed orders, with None for IDs that were not in the book
+        """
+        orders_by_id = self.orders_by_id
+        levels_by_side = self._levels_by_side
+        emptied: Dict[PriceLevel, OrderSide] = {}  # level -> side
+        removed: List[Optional[Order]] = []
+        self._version += 1  # Odd until the write completes
+        try:
+            for order_id in order_ids:
+                order = orders_by_id.pop(order_id, None)
+                if order is None:
+                    removed.append(None)
+                    continue
                 
-        # Remove from lookup dictionaries
-        del self.order_price_map[order_id]
-        del self.orders_by_id[order_id]
+                price_level = levels_by_side[order.side][order.sort_key]
+                price_level.unlink(order)
+                price_level.total_qty -= order.remaining_quantity
+                if price_level.head is None:
+                    emptied[price_level] = order.side
+                removed.append(order)
+        finally:
+            # Levels emptied before a failure are still dropped
+            for price_level, side in emptied.items():
+                del levels_by_side[side][price_level.price]
+                self._remove_level(price_level, side == OrderSide.BUY)
+            self._version += 1
         
-        return order
+        return removed
     
     def get_order(self, order_id: int) -> Optional[Order]:
         """Get an order by its ID."""
         return self.orders_by_id.get(order_id)
     
+    def _find_level(self, side: OrderSide, price: float) -> Optional[PriceLevel]:
+        """Look up the price level at a price, or None if there is none."""
+        try:
+            key = self._price_to_key(price, side == OrderSide.BUY)
+        except ValueError:
+            return None  # Off the tick grid, so no level can exist there
+        return self._levels_by_side[side].get(key)
+    
     def get_orders_at_price(self, side: OrderSide, price: float) -> List[Order]:
         """Get all orders at a specific price level."""
-        if side == OrderSide.BUY:
-            neg_price = -price
-            if neg_price in self.buy_price_levels:
-                price_level = self.buy_price_levels[neg_price]
-                return price_level.orders.copy()
-        else:
-            if price in self.sell_price_levels:
-                price_level = self.sell_price_levels[price]
-                return price_level.orders.copy()
-            
-        return []
+        price_level = self._find_level(side, price)
+        
+        return price_level.orders if price_level is not None else []
+    
+    def get_level_arrays(self, side: OrderSide, price: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the orders at a price level as contiguous arrays for vectorized analysis.
+        
+        Returns:
+            Tuple of (order_ids, remaining_quantities) in time priority; both empty
+            if there is no level at that price
+        """
+        price_level = self._find_level(side, price)
+        
+        if price_level is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        return price_level.to_arrays()
+    
+    def get_orders_array(self, side: OrderSide) -> np.ndarray:
+        """
+        Get the resting orders on one side as a structured ORDER_DTYPE array, best
+        price first and in time priority within a level.
+        
+        Rows are packed and contiguous, so fields can be analyzed as columns (e.g.
+        orders["remaining"]) instead of walking Order objects.
+        """
+        rows = []
+        price_level = self.best_buy if side == OrderSide.BUY else self.best_sell
+        while price_level is not None:
+            rows += price_level.to_records()
+            price_level = price_level.next_level
+        return np.array(rows, dtype=ORDER_DTYPE)
     
     def get_price_levels(self, side: OrderSide) -> List[Tuple[float, float]]:
         """
@@ -178,72 +518,184 @@ class OrderBook:
         Returns:
             List of (price, quantity) tuples
         """
-        result = []
+        # A fresh array rather than the shared buffer, so concurrent readers don't clash
+        levels = self._fill_price_levels(side, None)
+        # Two flat column lists zipped into tuples, no per-row list to convert
+        return list(zip(levels[:, 0].tolist(), levels[:, 1].tolist()))
+
+    def get_price_levels_np(self, side: OrderSide) -> np.ndarray:
+        """
+        Get all price levels for a side as an (N, 2) float64 array of (price, quantity),
+        best price first.
+        
+        The array is a view into a per-side buffer that is reused by the next call for
+        the same side; copy it if it needs to outlive that. The buffer is shared, so
+        this is for the writer thread only.
+        """
+        is_buy = side == OrderSide.BUY
+        n = len(self.buy_price_levels if is_buy else self.sell_price_levels)
+        buf = self._buy_snap_buf if is_buy else self._sell_snap_buf
+        if n > len(buf):
+            size = len(buf)
+            while size < n:
+                size *= 2
+            buf = np.empty((size, 2), dtype=np.float64)
+            if is_buy:
+                self._buy_snap_buf = buf
+            else:
+                self._sell_snap_buf = buf
+        return self._fill_price_levels(side, buf)
+    
+    def _fill_price_levels(self, side: OrderSide, buf: Optional[np.ndarray]) -> np.ndarray:
+        """
+        Walk a side's levels into buf, or into a freshly allocated array if buf is None.
         
+        Raises IndexError if a concurrent write grows the side past the array mid-walk.
+        """
         if side == OrderSide.BUY:
-            for neg_price in self.buy_price_levels:
-                price_level = self.buy_price_levels[neg_price]
-                result.append((-neg_price, price_level.get_total_quantity()))
+            n = len(self.buy_price_levels)
+            price_level = self.best_buy
         else:
-            for price in self.sell_price_levels:
-                price_level = self.sell_price_levels[price]
-                result.append((price, price_level.get_total_quantity()))
-                
-        return result
+            n = len(self.sell_price_levels)
+            price_level = self.best_sell
+        
+        out = np.empty((n, 2), dtype=np.float64) if buf is None else buf[:n]
+        i = 0
+        while price_level is not None:
+            out[i, 0] = price_level.price
+            out[i, 1] = price_level.total_qty
+            price_level = price_level.next_level
+            i += 1
+        
+        self._keys_to_prices(out[:, 0], side == OrderSide.BUY)
+        return out
+
+    def get_best_bid(self) -> Optional[float]:
+        """Get the highest buy price, or None if there are no bids."""
+        return self._key_to_price(self.best_buy.price, True) if self.best_buy is not None else None
+
+    def get_best_ask(self) -> Optional[float]:
+        """Get the lowest sell price, or None if there are no asks."""
+        return self._key_to_price(self.best_sell.price, False) if self.best_sell is not None else None
     
     def get_order_book_snapshot(self) -> Tuple[List[Tuple[float, float]], List[Tuple[float, float]]]:
         """
         Get a snapshot of the current order book.
         
+        The result is memoized until the book next changes, so callers must not
+        mutate it. It is safe to call from a reader thread while another thread
+        writes to the book.
+        
         Returns:
             Tuple of (buy_orders, sell_orders) where each is a list of (price, quantity) tuples
         """
+        cached = self._levels_cache
+        if cached is None or cached[0] != self._version:
+            cached = self._stable_read(self._build_levels)
+            self._levels_cache = cached  # Published with a single reference store
+        return cached[1]
+    
+    def _build_levels(self) -> Tuple[List[Tuple[float, float]], List[Tuple[float, float]]]:
+        """Build the (buy_orders, sell_orders) level lists for get_order_book_snapshot."""
         return self.get_price_levels(OrderSide.BUY), self.get_price_levels(OrderSide.SELL)
     
+    def _stable_read(self, build: Callable[[], Any], timeout: float = 5.0) -> Tuple[int, Any]:
+        """
+        Run a read-only build against a consistent view of the book.
+        
+        The book has a single writer thread. Readers on other threads take no lock:
+        the build is retried if a write was in progress when it started (odd version)
+        or ran while it did (version changed), seqlock style. A write landing mid-walk
+        can also make the level list outgrow the arrays sized for it.
+        
+        A read from a trade callback on the thread running the fills can't wait for
+        its own write to finish, so it builds from the book as it stands; the result
+        is tagged with version -1 so it is never memoized.
+        
+        Args:
+            timeout: Seconds to wait for an in-progress write before giving up
+        
+        Returns:
+            Tuple of (version, result) for the version the result was built at
+        
+        Raises:
+            RuntimeError: If the version stays odd for longer than the timeout
+        """
+        deadline = None
+        while True:
+            version = self._version
+            if version & 1:
+                if self._fill_thread == get_ident():
+                    return -1, build()
+                # Only a spinning reader pays for the clock
+                if deadline is None:
+                    deadline = time.monotonic() + timeout
+                elif time.monotonic() > deadline:
+                    raise RuntimeError(
+                        f"Order book write still in progress after {timeout}s (version {version})")
+                time.sleep(0)  # Yield to the writer
+                continue
+            try:
+                result = build()
+            except IndexError:
+                continue
+            if self._version == version:
+                return version, result
+    
+    def _level_arrays(self, price_level: Optional[PriceLevel],
+                      n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Walk a side's level list once into (keys, quantities, order counts) arrays."""
+        keys = np.empty(n, dtype=np.float64)
+        qtys = np.empty(n, dtype=np.float64)
+        counts = np.empty(n, dtype=np.int64)
+        i = 0
+        while price_level is not None:
+            keys[i] = price_level.price
+            qtys[i] = price_level.total_qty
+            counts[i] = price_level.count
+            price_level = price_level.next_level
+            i += 1
+        return keys, qtys, counts
+    
     def get_snapshot(self) -> Dict[str, Any]:
         """
         Get a comprehensive snapshot of the order book in dictionary format.
         
+        The result is memoized until the book next changes (its timestamp is when
+        it was built), so callers must not mutate it. It is safe to call from a
+        reader thread while another thread writes to the book.
+        
         Returns:
             Dictionary with buy and sell sides, each containing lists of price levels
             with detailed information including price, quantity, and number of orders
         """
-        buy_levels, sell_levels = self.get_order_book_snapshot()
+        cached = self._snapshot_cache
+        if cached is None or cached[0] != self._version:
+            cached = self._stable_read(self._build_snapshot)
+            self._snapshot_cache = cached  # Published with a single reference store
+        return cached[1]
+    
+    def _build_snapshot(self) -> Dict[str, Any]:
+        """Build the snapshot dictionary returned by get_snapshot."""
+        buy_prices, buy_qtys, buy_counts = self._level_arrays(self.best_buy, len(self.buy_price_levels))
+        sell_prices, sell_qtys, sell_counts = self._level_arrays(self.best_sell, len(self.sell_price_levels))
+        self._keys_to_prices(buy_prices, True)
+        self._keys_to_prices(sell_prices, False)
+        spread, mid_price = summarize_levels(buy_prices, sell_prices)
         
-        # Create a more detailed representation
-        return {
-            "timestamp": int(time.time() * 1000),
+        snapshot = {
+            # Wall-clock epoch milliseconds like order timestamps, in integer arithmetic
+            "timestamp": time.time_ns() // 1_000_000,
             "buy_side": [
-                {"price": price, "quantity": quantity, "order_count": len(self.get_orders_at_price(OrderSide.BUY, price))}
-                for price, quantity in buy_levels
+                {"price": price, "quantity": quantity, "order_count": count}
+                for price, quantity, count in zip(buy_prices.tolist(), buy_qtys.tolist(), buy_counts.tolist())
             ],
             "sell_side": [
-                {"price": price, "quantity": quantity, "order_count": len(self.get_orders_at_price(OrderSide.SELL, price))}
-                for price, quantity in sell_levels
+                {"price": price, "quantity": quantity, "order_count": count}
+                for price, quantity, count in zip(sell_prices.tolist(), sell_qtys.tolist(), sell_counts.tolist())
             ],
-            "spread": sell_levels[0][0] - buy_levels[0][0] if sell_levels and buy_levels else None,
-            "mid_price": (sell_levels[0][0] + buy_levels[0][0]) / 2 if sell_levels and buy_levels else None,
+            "spread": None if math.isnan(spread) else spread,
+            "mid_price": None if math.isnan(mid_price) else mid_price,
             "total_orders": len(self.orders_by_id)
         }
-    
-    def clear_caches(self) -> None:
-        """
-        Clear caches to free memory.
-        Call this periodically if memory usage is a concern.
-        """
-        self._price_level_cache.clear()
-        self._cache_hits = 0
-        self._cache_misses = 0
-        
-    def get_cache_stats(self) -> Dict[str, Any]:
-        """Get statistics about cache performance."""
-        total_lookups = self._cache_hits + self._cache_misses
-        hit_ratio = self._cache_hits / total_lookups if total_lookups > 0 else 0.0
-        
-        return {
-            "cache_hits": self._cache_hits,
-            "cache_misses": self._cache_misses,
-            "hit_ratio": hit_ratio,
-            "cache_size": len(self._price_level_cache),
-            "max_cache_size": self._max_cache_size
-        } 
\ No newline at end of file
+        return snapshot
@@ -5,12 +5,21 @@ import time
 import logging
 from typing import Dict, List, Optional, Tuple, Any
 
+import numpy as np
+
 from py_rs_quant.core.enums import OrderSide, OrderType, OrderStatus
 from py_rs_quant.core.models import Order
 from py_rs_quant.core.matcher import Matcher
+from py_rs_quant.core.utils import passive_run_end
 
 logger = logging.getLogger(__name__)
 
+_BUY = OrderSide.BUY
+_LIMIT = OrderType.LIMIT
+_MARKET = OrderType.MARKET
+_NEW = OrderStatus.NEW
+_CANCELLED = OrderStatus.CANCELLED
+
 
 class OrderProcessor:
     """
@@ -19,7 +28,9 @@ class OrderProcessor:
     """
     
     __slots__ = (
-        'next_order_id', 'matcher', '_order_pool', '_max_order_pool_size'
+        'next_order_id', 'matcher', '_order_pool', '_max_order_pool_size', '_min_bulk_run',
+        '_match_by_side', 'submit_limit_buy', 'submit_limit_sell', 'submit_market_buy',
+        'submit_market_sell', '_limit_by_side', '_market_by_side'
     )
     
     def __init__(self, matcher: Matcher):
@@ -32,9 +43,96 @@ class OrderProcessor:
         self.next_order_id = 1
         self.matcher = matcher
         
-        # Object recycling pools for reducing GC pressure
-        self._order_pool = []
+        # Matcher entry point per side, looked up by OrderSide instead of branching
+        self._match_by_side = {OrderSide.BUY: matcher.match_buy_order,
+                               OrderSide.SELL: matcher.match_sell_order}
+        
+        # Object recycling pools for reducing GC pressure, filled up front so the first
+        # burst of orders reuses objects instead of allocating them on the hot path
         self._max_order_pool_size = 2000
+        self._order_pool = [Order(0, _BUY, _LIMIT, 0.0, 0.0)
+                            for _ in range(self._max_order_pool_size)]
+        
+        # Shortest passive run in an array batch worth a bulk book load
+        self._min_bulk_run = 32
+        
+        # Submission functions specialized per order type and side, so the side and
+        # type are baked in rather than branched on (callers that know both can use
+        # them directly)
+        self.submit_limit_buy = self._make_submit_limit(OrderSide.BUY)
+        self.submit_limit_sell = self._make_submit_limit(OrderSide.SELL)
+        self.submit_market_buy = self._make_submit_market(OrderSide.BUY)
+        self.submit_market_sell = self._make_submit_market(OrderSide.SELL)
+        self._limit_by_side = {OrderSide.BUY: self.submit_limit_buy,
+                               OrderSide.SELL: self.submit_limit_sell}
+        self._market_by_side = {OrderSide.BUY: self.submit_market_buy,
+                                OrderSide.SELL: self.submit_market_sell}
+    
+    def _make_submit_limit(self, side: OrderSide):
+        """Build a limit order submit function for one side, with its matcher bound."""
+        pool = self._order_pool
+        match = self._match_by_side[side]
+        create_order = self.create_order
+        is_buy = side == _BUY
+        
+        def submit(price: float, quantity: float, timestamp: Optional[int] = None,
+                   symbol: Optional[str] = None) -> int:
+            # Pool hit inlined; create_order covers an empty pool and debug logging
+            if pool and not (__debug__ and logger.isEnabledFor(logging.DEBUG)):
+                order = pool.pop()
+                order_id = self.next_order_id
+                self.next_order_id = order_id + 1
+                order.id = order_id
+                order.side = side
+                order.order_type = _LIMIT
+                order.price = price
+                order.sort_key = -price if is_buy else price
+                order.quantity = quantity
+                order.filled_quantity = 0.0
+                order.remaining_quantity = quantity
+                order.status = _NEW
+                order.timestamp = timestamp or time.time_ns() // 1_000_000
+                order.symbol = symbol
+                order.prev_order = order.next_order = None
+            else:
+                order = create_order(side, _LIMIT, price, quantity, timestamp, symbol)
+            
+            match(order)
+            return order.id
+        
+        return submit
+    
+    def _make_submit_market(self, side: OrderSide):
+        """Build a market order submit function for one side, with its matcher bound."""
+        pool = self._order_pool
+        match = self._match_by_side[side]
+        create_order = self.create_order
+        
+        def submit(quantity: float, timestamp: Optional[int] = None,
+                   symbol: Optional[str] = None) -> int:
+            # Pool hit inlined; create_order covers an empty pool and debug logging
+            if pool and not (__debug__ and logger.isEnabledFor(logging.DEBUG)):
+                order = pool.pop()
+                order_id = self.next_order_id
+                self.next_order_id = order_id + 1
+                order.id = order_id
+                order.side = side
+                order.order_type = _MARKET
+                order.price = order.sort_key = None
+                order.quantity = quantity
+                order.filled_quantity = 0.0
+                order.remaining_quantity = quantity
+                order.status = _NEW
+                order.timestamp = timestamp or time.time_ns() // 1_000_000
+                order.symbol = symbol
+                order.prev_order = order.next_order = None
+            else:
+                order = create_order(side, _MARKET, None, quantity, timestamp, symbol)
+            
+            match(order)
+            return order.id
+        
+        return submit
     
     def create_order(self, 
                     side: OrderSide, 
@@ -58,8 +156,8 @@ class OrderProcessor:
             The created Order object
         """
         order_id = self.next_order_id
-        self.next_order_id += 1
-        ts = timestamp or int(time.time() * 1000)
+        self.next_order_id = order_id + 1  # Reuse the loaded id rather than reload it
+        ts = timestamp or time.time_ns() // 1_000_000
         
         # Only log in debug mode with lazy evaluation
         if __debug__ and logger.isEnabledFor(logging.DEBUG):
@@ -69,18 +167,21 @@ class OrderProcessor:
             logger.debug(f"Creating {order_type_name} {side_name} order: id={order_id}{price_str}, qty={quantity}, symbol={symbol or ''}")
         
         # Create order from pool if available to reduce GC pressure
-        if self._order_pool:
-            order = self._order_pool.pop()
+        pool = self._order_pool
+        if pool:
+            order = pool.pop()
             order.id = order_id
             order.side = side
             order.order_type = order_type
             order.price = price
+            order.sort_key = (-price if side == _BUY else price) if price is not None else None
             order.quantity = quantity
             order.filled_quantity = 0.0
             order.remaining_quantity = quantity
-            order.status = OrderStatus.NEW
+            order.status = _NEW
             order.timestamp = ts
             order.symbol = symbol
+            order.prev_order = order.next_order = None  # Never carry stale queue links
         else:
             order = Order(order_id, side, order_type, price, quantity, ts, symbol)
             
@@ -101,23 +202,7 @@ class OrderProcessor:
         Returns:
             The order ID
         """
-        # Create order object
-        order = self.create_order(
-            side=side,
-            order_type=OrderType.LIMIT,
-            price=price,
-            quantity=quantity,
-            timestamp=timestamp,
-            symbol=symbol
-        )
-        
-        # Process the order through the matcher
-        if side == OrderSide.BUY:
-            self.matcher.match_buy_order(order)
-        else:
-            self.matcher.match_sell_order(order)
-        
-        return order.id
+        return self._limit_by_side[side](price, quantity, timestamp, symbol)
     
     def create_market_order(self, side: OrderSide, quantity: float,
                            timestamp: Optional[int] = None, symbol: Optional[str] = None) -> int:
@@ -133,23 +218,7 @@ class OrderProcessor:
         Returns:
             The order ID
         """
-        # Create order object
-        order = self.create_order(
-            side=side,
-            order_type=OrderType.MARKET,
-            price=None,
-            quantity=quantity,
-            timestamp=timestamp,
-            symbol=symbol
-        )
-        
-        # Process the order through the matcher
-        if side == OrderSide.BUY:
-            self.matcher.match_buy_order(order)
-        else:
-            self.matcher.match_sell_order(order)
-        
-        return order.id
+        return self._market_by_side[side](quantity, timestamp, symbol)
     
     def batch_create_orders(self, orders: List[Tuple[OrderSide, OrderType, Optional[float], float, Optional[int], Optional[str]]]) -> List[int]:
         """
@@ -161,36 +230,115 @@ class OrderProcessor:
         Returns:
             List of order IDs created
         """
-        order_objects = []
+        # Bound once, so the loop below only loads locals
+        create_order = self.create_order
+        match_by_side = self._match_by_side
         order_ids = []
+        append_id = order_ids.append
         
-        # Create all order objects first
-        current_timestamp = int(time.time() * 1000)
+        # Create and match in one pass: matching never refills the order pool, so
+        # this allocates the same ids and objects as creating everything first
+        current_timestamp = time.time_ns() // 1_000_000
         for side, order_type, price, quantity, timestamp, symbol in orders:
-            ts = timestamp if timestamp is not None else current_timestamp
-            
-            # Create order
-            order = self.create_order(
-                side=side,
-                order_type=order_type,
-                price=price,
-                quantity=quantity,
-                timestamp=ts,
-                symbol=symbol
-            )
-                
-            order_objects.append(order)
-            order_ids.append(order.id)
-        
-        # Process each order with optimized methods
-        for order in order_objects:
-            if order.side == OrderSide.BUY:
-                self.matcher.match_buy_order(order)
-            else:
-                self.matcher.match_sell_order(order)
+            # Positional: keyword binding is measurable at per-order rates
+            order = create_order(side, order_type, price, quantity,
+                                 timestamp if timestamp is not None else current_timestamp, symbol)
+            append_id(order.id)
+            match_by_side[side](order)
         
         return order_ids
     
+    def batch_create_orders_np(self, sides: np.ndarray, order_types: np.ndarray, prices: np.ndarray,
+                               quantities: np.ndarray, timestamps: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Process a batch of orders given as column arrays, in array order.
+        
+        Order IDs are allocated as one contiguous range and the columns are unboxed
+        in bulk. A compiled scan finds runs of limit orders that cross neither the
+        book nor each other; long runs are loaded with OrderBook.add_orders_batch,
+        everything else is matched one order at a time.
+        
+        Args:
+            sides: OrderSide values for each order
+            order_types: OrderType values for each order
+            prices: Limit prices (ignored for market orders)
+            quantities: Order quantities
+            timestamps: Optional timestamps (milliseconds since epoch), default now
+        
+        Returns:
+            int64 array of the order IDs created
+            
+        Raises:
+            ValueError: If the arrays differ in length or hold unknown side/type values
+        """
+        sides = np.asarray(sides)
+        order_types = np.asarray(order_types)
+        prices = np.asarray(prices, dtype=np.float64)
+        quantities = np.asarray(quantities, dtype=np.float64)
+        n = len(sides)
+        if timestamps is None:
+            timestamps = np.full(n, time.time_ns() // 1_000_000, dtype=np.int64)
+        else:
+            timestamps = np.asarray(timestamps, dtype=np.int64)
+        if not len(order_types) == len(prices) == len(quantities) == len(timestamps) == n:
+            raise ValueError("Order arrays must all have the same length")
+        
+        is_buy = sides == OrderSide.BUY.value
+        is_limit = order_types == OrderType.LIMIT.value
+        if not (is_buy | (sides == OrderSide.SELL.value)).all():
+            raise ValueError("sides must hold OrderSide values")
+        if not (is_limit | (order_types == OrderType.MARKET.value)).all():
+            raise ValueError("order_types must hold OrderType values")
+        
+        # Crossing is decided on the book's own key scale: int ticks on a tick grid
+        order_book = self.matcher.order_book
+        levels = prices
+        if order_book.tick_size is not None:
+            levels = prices.copy()
+            levels[is_limit] = order_book._prices_to_ticks(prices[is_limit])
+        
+        # IDs are only taken once the batch has passed validation
+        ids = np.arange(self.next_order_id, self.next_order_id + n, dtype=np.int64)
+        self.next_order_id += n
+        
+        id_list = ids.tolist()
+        is_buy_list = is_buy.tolist()
+        is_limit_list = is_limit.tolist()
+        price_list = prices.tolist()
+        qty_list = quantities.tolist()
+        ts_list = timestamps.tolist()
+        
+        buy, sell = OrderSide.BUY, OrderSide.SELL
+        limit, market = OrderType.LIMIT, OrderType.MARKET
+        match_buy = self.matcher.match_buy_order
+        match_sell = self.matcher.match_sell_order
+        i = 0
+        while i < n:
+            best_bid = -order_book.best_buy.price if order_book.best_buy is not None else -np.inf
+            best_ask = order_book.best_sell.price if order_book.best_sell is not None else np.inf
+            end = passive_run_end(is_buy, is_limit, levels, quantities, i,
+                                  float(best_bid), float(best_ask))
+            if end - i >= self._min_bulk_run:
+                order_book.add_orders_batch(prices[i:end], quantities[i:end], sides[i:end],
+                                            ids[i:end], timestamps[i:end])
+                i = end
+                continue
+            
+            # A short passive run and the order that ended it go through the matcher
+            for j in range(i, min(end + 1, n)):
+                side = buy if is_buy_list[j] else sell
+                if is_limit_list[j]:
+                    order = Order(id_list[j], side, limit, price_list[j], qty_list[j], ts_list[j])
+                else:
+                    order = Order(id_list[j], side, market, None, qty_list[j], ts_list[j])
+                if is_buy_list[j]:
+                    match_buy(order)
+                else:
+                    match_sell(order)
+            i = min(end + 1, n)
+        
+        return ids
+    
     def cancel_order(self, order_id: int) -> bool:
         """
         Cancel an order by its ID.
@@ -201,25 +349,42 @@ class OrderProcessor:
         Returns:
             True if the order was cancelled, False otherwise
         """
-        # Get order book from matcher
-        order_book = self.matcher.order_book
-        
-        # Early exit if order not found
-        if order_id not in order_book.orders_by_id:
+        # One id lookup: the book unlinks the order from its level queue in O(1)
+        order = self.matcher.order_book.remove_order(order_id)
+        if order is None:
             return False
-            
-        order = order_book.orders_by_id[order_id]
         
-        # Remove from order book
-        removed_order = order_book.remove_order(order_id)
-        if not removed_order:
-            return False
+        # Update order status and recycle (inline, no _recycle_order frame)
+        order.status = _CANCELLED
+        pool = self._order_pool
+        if len(pool) < self._max_order_pool_size:
+            pool.append(order)
+        return True
+    
+    def cancel_orders(self, order_ids: List[int]) -> List[bool]:
+        """
+        Cancel a batch of orders, e.g. when pulling all quotes at once.
         
-        # Update order status and recycle
-        order.status = OrderStatus.CANCELLED
-        self._recycle_order(order)
+        Args:
+            order_ids: The IDs of the orders to cancel
             
-        return True
+        Returns:
+            For each ID, True if the order was cancelled, False otherwise
+        """
+        results = []
+        cancelled = []
+        for order in self.matcher.order_book.remove_orders(order_ids):
+            if order is None:
+                results.append(False)
+                continue
+            order.status = _CANCELLED
+            cancelled.append(order)
+            results.append(True)
+        
+        # Return the batch to the pool in one extend rather than per order
+        pool = self._order_pool
+        pool.extend(cancelled[:self._max_order_pool_size - len(pool)])
+        return results
     
     def _recycle_order(self, order: Order) -> None:
         """
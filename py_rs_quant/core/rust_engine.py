@@ -5,8 +5,13 @@ import time
 import logging
 from typing import Dict, List, Optional, Tuple, Any, Callable
 
+import numpy as np
+
 try:
     import matching_engine
+    # Importing a name also rules out an unbuilt crate directory on the path,
+    # which imports as an empty namespace package
+    from matching_engine import PyOrderSide
     RUST_AVAILABLE = True
 except ImportError:
     RUST_AVAILABLE = False
@@ -16,6 +21,11 @@ from py_rs_quant.core.models import Order, Trade
 
 logger = logging.getLogger(__name__)
 
+_BUY = OrderSide.BUY
+if RUST_AVAILABLE:
+    _RUST_BUY = PyOrderSide.Buy
+    _RUST_SELL = PyOrderSide.Sell
+
 
 class RustMatchingEngine:
     """
@@ -25,13 +35,14 @@ class RustMatchingEngine:
     Rust's zero-cost abstractions and memory safety.
     """
     
+    __slots__ = ('_rust_engine',)
+    
     def __init__(self):
         """Initialize a new Rust matching engine."""
         if not RUST_AVAILABLE:
             raise ImportError("Rust matching engine is not available. Please install it with 'cd matching_engine && maturin develop --release'")
             
         self._rust_engine = matching_engine.PyOrderBook()
-        self._next_trade_id = 1
         
     def add_limit_order(self, side: OrderSide, price: float, quantity: float, 
                         timestamp: Optional[int] = None, symbol: Optional[str] = None) -> int:
@@ -49,10 +60,10 @@ class RustMatchingEngine:
             The order ID
         """
         # Convert Python enums to Rust enums
-        rust_side = matching_engine.PyOrderSide.Buy if side == OrderSide.BUY else matching_engine.PyOrderSide.Sell
+        rust_side = _RUST_BUY if side == _BUY else _RUST_SELL
         
         # Use current timestamp if not provided
-        timestamp = timestamp or int(time.time() * 1000)
+        timestamp = timestamp or time.time_ns() // 1_000_000
         
         # Call Rust implementation
         return self._rust_engine.add_limit_order(rust_side, price, quantity, timestamp)
@@ -72,10 +83,10 @@ class RustMatchingEngine:
             The order ID
         """
         # Convert Python enums to Rust enums
-        rust_side = matching_engine.PyOrderSide.Buy if side == OrderSide.BUY else matching_engine.PyOrderSide.Sell
+        rust_side = _RUST_BUY if side == _BUY else _RUST_SELL
         
         # Use current timestamp if not provided
-        timestamp = timestamp or int(time.time() * 1000)
+        timestamp = timestamp or time.time_ns() // 1_000_000
         
         # Call Rust implementation
         return self._rust_engine.add_market_order(rust_side, quantity, timestamp)
@@ -90,15 +101,44 @@ class RustMatchingEngine:
         Returns:
             List of order IDs created
         """
-        # Not directly supported in Rust interface, so we'll implement it here
-        results = []
+        # Split into columns for a single call across the FFI boundary
+        now = time.time_ns() // 1_000_000
+        sides, order_types, prices, quantities, timestamps = [], [], [], [], []
         for side, order_type, price, quantity, timestamp, symbol in orders:
-            if order_type == OrderType.LIMIT:
-                order_id = self.add_limit_order(side, price, quantity, timestamp, symbol)
-            else:
-                order_id = self.add_market_order(side, quantity, timestamp, symbol)
-            results.append(order_id)
-        return results
+            # IntEnum members convert to u8 as they are, no .value property lookup
+            sides.append(side)
+            order_types.append(order_type)
+            prices.append(price if price is not None else 0.0)
+            quantities.append(quantity)
+            timestamps.append(timestamp or now)
+        return self._rust_engine.batch_add_orders(sides, order_types, prices, quantities, timestamps)
+    
+    def batch_add_orders_np(self, sides: np.ndarray, order_types: np.ndarray, prices: np.ndarray,
+                            quantities: np.ndarray, timestamps: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Process a batch of orders given as column arrays, in array order.
+        
+        Args:
+            sides: OrderSide values for each order
+            order_types: OrderType values for each order
+            prices: Limit prices (ignored for market orders)
+            quantities: Order quantities
+            timestamps: Optional timestamps (milliseconds since epoch), default now
+        
+        Returns:
+            int64 array of the order IDs created
+        """
+        n = len(sides)
+        if timestamps is None:
+            timestamps = np.full(n, time.time_ns() // 1_000_000, dtype=np.int64)
+        ids = self._rust_engine.batch_add_orders(
+            np.asarray(sides, dtype=np.uint8).tolist(),
+            np.asarray(order_types, dtype=np.uint8).tolist(),
+            np.nan_to_num(np.asarray(prices, dtype=np.float64)).tolist(),
+            np.asarray(quantities, dtype=np.float64).tolist(),
+            np.asarray(timestamps, dtype=np.int64).tolist(),
+        )
+        return np.asarray(ids, dtype=np.int64)
     
     def cancel_order(self, order_id: int) -> bool:
         """
@@ -119,23 +159,33 @@ class RustMatchingEngine:
         Returns:
             Dictionary with buy and sell sides, each containing lists of price levels
         """
-        # Convert Rust snapshot to Python format
-        buy_levels, sell_levels = self._rust_engine.get_order_book_snapshot()
+        # Level dicts, order counts, spread and mid price are built Rust-side
+        snapshot = self._rust_engine.get_snapshot()
+        snapshot["timestamp"] = time.time_ns() // 1_000_000
+        return snapshot
+    
+    def get_order_book_arrays(self) -> Dict[str, Any]:
+        """
+        Get the order book levels as NumPy arrays, best price first, without building
+        a dict per level.
         
-        # Format similar to Python implementation
+        Returns:
+            Dictionary of buy_prices, buy_quantities, sell_prices and sell_quantities
+            arrays, plus spread and mid_price (None when either side is empty)
+        """
+        buy_prices, buy_qtys, sell_prices, sell_qtys = self._rust_engine.get_level_columns()
+        spread = mid_price = None
+        if buy_prices and sell_prices:
+            best_bid, best_ask = buy_prices[0], sell_prices[0]
+            spread, mid_price = best_ask - best_bid, (best_ask + best_bid) / 2
         return {
-            "timestamp": int(time.time() * 1000),
-            "buy_side": [
-                {"price": price, "quantity": quantity, "order_count": 1}
-                for price, quantity in buy_levels
-            ],
-            "sell_side": [
-                {"price": price, "quantity": quantity, "order_count": 1}
-                for price, quantity in sell_levels
-            ],
-            "spread": sell_levels[0][0] - buy_levels[0][0] if sell_levels and buy_levels else None,
-            "mid_price": (sell_levels[0][0] + buy_levels[0][0]) / 2 if sell_levels and buy_levels else None,
-            "total_orders": len(buy_levels) + len(sell_levels)
+            "buy_prices": np.array(buy_prices, dtype=np.float64),
+            "buy_quantities": np.array(buy_qtys, dtype=np.float64),
+            "sell_prices": np.array(sell_prices, dtype=np.float64),
+            "sell_quantities": np.array(sell_qtys, dtype=np.float64),
+            "spread": spread,
+            "mid_price": mid_price,
+            "timestamp": time.time_ns() // 1_000_000,
         }
     
     def get_trades(self) -> List[Trade]:
@@ -145,41 +195,39 @@ class RustMatchingEngine:
         Returns:
             List of executed trades
         """
-        # Convert Rust trades to Python Trade objects
-        rust_trades = self._rust_engine.get_trades()
-        python_trades = []
-        
-        for rust_trade in rust_trades:
-            # Create Python Trade object from Rust trade
-            # When trade is a custom PyTrade object, we need to access its properties directly
-            try:
-                # Try accessing attributes directly first
-                trade = Trade(
-                    trade_id=rust_trade.trade_id if hasattr(rust_trade, 'trade_id') else self._next_trade_id,
-                    buy_order_id=rust_trade.buy_order_id if hasattr(rust_trade, 'buy_order_id') else 0,
-                    sell_order_id=rust_trade.sell_order_id if hasattr(rust_trade, 'sell_order_id') else 0,
-                    price=rust_trade.price if hasattr(rust_trade, 'price') else 0.0,
-                    quantity=rust_trade.quantity if hasattr(rust_trade, 'quantity') else 0.0,
-                    symbol=rust_trade.symbol if hasattr(rust_trade, 'symbol') else "",
-                    timestamp=rust_trade.timestamp if hasattr(rust_trade, 'timestamp') else int(time.time() * 1000)
-                )
-                self._next_trade_id += 1
-            except AttributeError:
-                # If attributes aren't accessible, try another approach
-                logger.warning(f"Unable to access Rust trade attributes directly: {rust_trade}")
-                self._next_trade_id += 1
-                trade = Trade(
-                    trade_id=self._next_trade_id,
-                    buy_order_id=0,
-                    sell_order_id=0,
-                    price=0.0,
-                    quantity=0.0,
-                    timestamp=int(time.time() * 1000)
-                )
-            
-            python_trades.append(trade)
-            
-        return python_trades
+        # One call returns every trade field as a column, no per-trade FFI attribute access
+        ids, buy_ids, sell_ids, prices, quantities, timestamps, symbols = \
+            self._rust_engine.get_trade_columns()
+        return [
+            Trade(trade_id, buy_id, sell_id, price, quantity, symbol, timestamp)
+            for trade_id, buy_id, sell_id, price, quantity, timestamp, symbol
+            in zip(ids, buy_ids, sell_ids, prices, quantities, timestamps, symbols)
+        ]
+    
+    def get_trade_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Get all trades as NumPy columns, without building Trade objects.
+        
+        Returns:
+            Dictionary of trade_id, buy_order_id, sell_order_id, price, quantity and
+            timestamp arrays
+        """
+        # Arrays own the Rust column buffers; the u64 columns are reinterpreted as
+        # int64 in place (ids and millisecond timestamps stay far below 2**63)
+        ids, buy_ids, sell_ids, prices, quantities, timestamps = \
+            self._rust_engine.get_trade_arrays()
+        return {
+            "trade_id": ids.view(np.int64),
+            "buy_order_id": buy_ids.view(np.int64),
+            "sell_order_id": sell_ids.view(np.int64),
+            "price": prices,
+            "quantity": quantities,
+            "timestamp": timestamps.view(np.int64),
+        }
+    
+    def get_trade_count(self) -> int:
+        """Get the number of trades executed so far."""
+        return self._rust_engine.get_trade_count()
     
     def get_statistics(self) -> Dict[str, Any]:
         """
@@ -5,6 +5,7 @@ from typing import Dict, Any, List, Tuple, Optional
 import numpy as np
 import time
 
+from py_rs_quant.core.enums import OrderSide
 from py_rs_quant.core.utils import calculate_price_stats
 from py_rs_quant.core.order_book import OrderBook
 
@@ -14,6 +15,8 @@ class PriceStatisticsCalculator:
     Calculate price statistics from order book data.
     """
     
+    __slots__ = ('order_book', '_stats_cache', '_scratch')
+    
     def __init__(self, order_book: OrderBook):
         """
         Initialize the price statistics calculator.
@@ -22,99 +25,103 @@ class PriceStatisticsCalculator:
             order_book: The order book to calculate statistics for
         """
         self.order_book = order_book
+        # (book version, stats) of the last calculation
+        self._stats_cache: Optional[Tuple[int, Dict[str, Any]]] = None
+        # (N, 2) float64 rows for both sides' levels, buy rows first; grown by doubling
+        self._scratch = np.empty((128, 2), dtype=np.float64)
     
     def calculate_price_statistics(self) -> Dict[str, Any]:
         """
         Calculate price statistics from the current order book.
         
+        Like the book's snapshots, the result is memoized until the book next changes
+        (its timestamp is when it was calculated), so callers must not mutate it.
+        
         Returns:
             Dictionary of price statistics
         """
-        # Get price levels from order book
-        buy_levels, sell_levels = self.order_book.get_order_book_snapshot()
+        order_book = self.order_book
+        cached = self._stats_cache
+        if cached is not None and cached[0] == order_book._version:
+            return cached[1]
         
-        # Use the static method to calculate statistics
-        stats = self.calculate_from_price_levels(buy_levels, sell_levels)
+        # Both sides are read at one version, and the stats computed inside the read
+        # while the scratch rows are still current
+        version, stats = order_book._stable_read(self._build_statistics)
         stats["timestamp"] = int(time.time() * 1000)
-        
+        self._stats_cache = (version, stats)
         return stats
     
+    def _build_statistics(self) -> Dict[str, Any]:
+        """Walk both sides' levels into the scratch buffer and compute their statistics."""
+        order_book = self.order_book
+        n_buy = len(order_book.buy_price_levels)
+        n = n_buy + len(order_book.sell_price_levels)
+        scratch = self._scratch
+        if n > len(scratch):
+            size = len(scratch)
+            while size < n:
+                size *= 2
+            scratch = self._scratch = np.empty((size, 2), dtype=np.float64)
+        
+        # A write landing mid-walk can overrun the slices; _stable_read then retries
+        buy_levels = order_book._fill_price_levels(OrderSide.BUY, scratch[:n_buy])
+        sell_levels = order_book._fill_price_levels(OrderSide.SELL, scratch[n_buy:])
+        return self.calculate_from_price_levels(buy_levels, sell_levels)
+    
+    @staticmethod
+    def _side_statistics(levels) -> Dict[str, Any]:
+        """Statistics for one side's (price, quantity) levels."""
+        # One conversion to an (N, 2) array; prices and quantities are column views
+        levels = np.asarray(levels, dtype=np.float64).reshape(-1, 2)
+        if len(levels) == 0:
+            return {"min": 0.0, "max": 0.0, "mean": 0.0, "weighted_mean": 0.0, "std_dev": 0.0,
+                    "depth": 0, "total_quantity": 0.0}
+        
+        # The kernel's quantity sum doubles as the side's total
+        min_price, max_price, mean_price, weighted, std_dev, total_quantity = calculate_price_stats(
+            levels[:, 0], levels[:, 1])
+        return {
+            "min": min_price,
+            "max": max_price,
+            "mean": mean_price,
+            "weighted_mean": weighted,
+            "std_dev": std_dev,
+            "depth": len(levels),
+            "total_quantity": total_quantity
+        }
+    
     @staticmethod
     def calculate_from_price_levels(buy_levels: List[Tuple[float, float]], sell_levels: List[Tuple[float, float]]) -> Dict[str, Any]:
         """
         Calculate price statistics from buy and sell price levels.
         
         Args:
-            buy_levels: List of (price, quantity) tuples for buy orders
-            sell_levels: List of (price, quantity) tuples for sell orders
+            buy_levels: List of (price, quantity) tuples for buy orders, or an (N, 2) array
+            sell_levels: List of (price, quantity) tuples for sell orders, or an (N, 2) array
             
         Returns:
             Dictionary of price statistics
         """
-        # Extract prices and quantities
-        buy_prices = [price for price, _ in buy_levels]
-        buy_quantities = [qty for _, qty in buy_levels]
-            
-        sell_prices = [price for price, _ in sell_levels]
-        sell_quantities = [qty for _, qty in sell_levels]
-            
-        # Use numpy for calculations if we have enough data
-        if len(buy_prices) > 0 or len(sell_prices) > 0:
-            # Convert to numpy arrays
-            if buy_prices:
-                buy_prices_np = np.array(buy_prices)
-                buy_quantities_np = np.array(buy_quantities)
-                buy_min, buy_max, buy_mean, buy_weighted, buy_std = calculate_price_stats(buy_prices_np, buy_quantities_np)
-            else:
-                buy_min = buy_max = buy_mean = buy_weighted = buy_std = 0.0
-                
-            if sell_prices:
-                sell_prices_np = np.array(sell_prices)
-                sell_quantities_np = np.array(sell_quantities)
-                sell_min, sell_max, sell_mean, sell_weighted, sell_std = calculate_price_stats(sell_prices_np, sell_quantities_np)
-            else:
-                sell_min = sell_max = sell_mean = sell_weighted = sell_std = 0.0
-                
-            # Calculate midpoint if both sides have orders
-            if buy_prices and sell_prices:
-                best_bid = max(buy_prices)
-                best_ask = min(sell_prices)
-                midpoint = (best_bid + best_ask) / 2
-                spread = best_ask - best_bid
-            else:
-                midpoint = 0.0
-                spread = 0.0
-                
-            return {
-                "buy_side": {
-                    "min": buy_min,
-                    "max": buy_max,
-                    "mean": buy_mean,
-                    "weighted_mean": buy_weighted,
-                    "std_dev": buy_std,
-                    "depth": len(buy_prices),
-                    "total_quantity": sum(buy_quantities)
-                },
-                "sell_side": {
-                    "min": sell_min,
-                    "max": sell_max,
-                    "mean": sell_mean,
-                    "weighted_mean": sell_weighted,
-                    "std_dev": sell_std,
-                    "depth": len(sell_prices),
-                    "total_quantity": sum(sell_quantities)
-                },
-                "midpoint": midpoint,
-                "spread": spread
-            }
+        buy_side = PriceStatisticsCalculator._side_statistics(buy_levels)
+        sell_side = PriceStatisticsCalculator._side_statistics(sell_levels)
+        
+        # Calculate midpoint if both sides have orders
+        if buy_side["depth"] and sell_side["depth"]:
+            best_bid = buy_side["max"]
+            best_ask = sell_side["min"]
+            midpoint = (best_bid + best_ask) / 2
+            spread = best_ask - best_bid
         else:
-            # Return default values if no prices
-            return {
-                "buy_side": {"min": 0.0, "max": 0.0, "mean": 0.0, "weighted_mean": 0.0, "std_dev": 0.0, "depth": 0, "total_quantity": 0.0},
-                "sell_side": {"min": 0.0, "max": 0.0, "mean": 0.0, "weighted_mean": 0.0, "std_dev": 0.0, "depth": 0, "total_quantity": 0.0},
-                "midpoint": 0.0,
-                "spread": 0.0
-            }
+            midpoint = 0.0
+            spread = 0.0
+        
+        return {
+            "buy_side": buy_side,
+            "sell_side": sell_side,
+            "midpoint": midpoint,
+            "spread": spread
+        }
     
     @staticmethod
     def calculate_vwap(trades: List[Tuple[float, float]]) -> float:
@@ -122,18 +129,20 @@ class PriceStatisticsCalculator:
         Calculate Volume Weighted Average Price from trades.
         
         Args:
-            trades: List of (price, quantity) tuples
+            trades: List of (price, quantity) tuples, or an (N, 2) array
             
         Returns:
             VWAP or 0.0 if no trades
         """
-        if not trades:
+        # One (N, 2) conversion, then a dot product over the column views
+        trades = np.asarray(trades, dtype=np.float64).reshape(-1, 2)
+        if len(trades) == 0:
             return 0.0
             
-        total_value = sum(price * qty for price, qty in trades)
-        total_volume = sum(qty for _, qty in trades)
+        quantities = trades[:, 1]
+        total_volume = quantities.sum()
         
         if total_volume <= 0:
             return 0.0
             
-        return total_value / total_volume 
\ No newline at end of file
+        return float(trades[:, 0] @ quantities / total_volume) 
\ No newline at end of file
@@ -1,10 +1,14 @@
 """
 Trade execution logic for the matching engine.
 """
-from typing import List, Optional, Callable
+from collections import deque
+from itertools import islice
+from typing import Dict, List, Optional, Callable
 import logging
 import time
 
+import numpy as np
+
 from py_rs_quant.core.enums import OrderStatus
 from py_rs_quant.core.models import Trade, Order
 
@@ -17,67 +21,90 @@ class TradeExecutor:
     Optimized for high-performance trading with low latency.
     """
     
-    __slots__ = ('next_trade_id', 'trades', 'trade_callback', '_trade_pool', '_max_trade_pool_size')
+    __slots__ = ('next_trade_id', 'trades', 'trade_callback', '_trade_pool', '_max_trade_pool_size',
+                 'execute_trade')
     
-    def __init__(self):
+    def __init__(self, max_history: int = 100_000):
+        """
+        Initialize a trade executor.
+        
+        Args:
+            max_history: Trades kept in the history ring; once full, each new trade
+                drops the oldest without reallocating
+        """
         self.next_trade_id = 1
-        self.trades = []
+        self.trades = deque(maxlen=max_history)
         self.trade_callback = None
         
-        # Object recycling pools for reducing GC pressure
-        self._trade_pool = []
+        # Object recycling pools for reducing GC pressure, filled up front so the first
+        # burst of fills reuses trades rather than allocating them
         self._max_trade_pool_size = 1000
+        self._trade_pool = [Trade(0, 0, 0, 0.0, 0.0)
+                            for _ in range(self._max_trade_pool_size)]
+        
+        # Per-fill entry point as a closure over the history, pool and callback, so a
+        # fill loads them as cell variables instead of through self (the history and
+        # pool are only ever mutated in place; a new callback rebuilds the closure)
+        self.execute_trade = self._make_execute_trade()
     
     def register_trade_callback(self, callback: Callable) -> None:
         """Register a callback to be called when a trade is executed."""
         self.trade_callback = callback
+        # Rebind the per-fill closure so it carries the new callback
+        self.execute_trade = self._make_execute_trade()
     
-    def execute_trade(self, buy_order: Order, sell_order: Order, price: float, quantity: float) -> Trade:
-        """
-        Execute a trade between two orders with optimized performance.
+    def _make_execute_trade(self) -> Callable[[Order, Order, float, float], Trade]:
+        """Build execute_trade with the trade history append, trade pool and callback bound."""
+        trades_append = self.trades.append
+        pool = self._trade_pool
+        callback = self.trade_callback
         
-        Args:
-            buy_order: The buy order
-            sell_order: The sell order
-            price: The execution price
-            quantity: The execution quantity
+        def execute_trade(buy_order: Order, sell_order: Order, price: float, quantity: float) -> Trade:
+            """
+            Execute a trade between two orders with optimized performance.
             
-        Returns:
-            The created Trade object
-        """
-        # Create trade with minimal overhead
-        trade_id = self.next_trade_id
-        self.next_trade_id += 1
-        
-        # Use object pool to reduce GC pressure
-        if self._trade_pool:
-            trade = self._trade_pool.pop()
-            trade.trade_id = trade_id
-            trade.buy_order_id = buy_order.id
-            trade.sell_order_id = sell_order.id
-            trade.price = price
-            trade.quantity = quantity
-            trade.symbol = buy_order.symbol or sell_order.symbol
-            trade.timestamp = max(buy_order.timestamp, sell_order.timestamp)
-        else:
-            trade = Trade(
-                trade_id=trade_id,
-                buy_order_id=buy_order.id,
-                sell_order_id=sell_order.id,
-                price=price,
-                quantity=quantity,
-                symbol=buy_order.symbol or sell_order.symbol,
-                timestamp=max(buy_order.timestamp, sell_order.timestamp)
-            )
-        
-        # Add to trade history
-        self.trades.append(trade)
-        
-        # Invoke callback if registered
-        if self.trade_callback is not None:
-            self.trade_callback(trade)
+            Args:
+                buy_order: The buy order
+                sell_order: The sell order
+                price: The execution price
+                quantity: The execution quantity
+                
+            Returns:
+                The created Trade object
+            """
+            # Create trade with minimal overhead
+            trade_id = self.next_trade_id
+            self.next_trade_id = trade_id + 1
+            symbol = buy_order.symbol or sell_order.symbol
+            buy_ts = buy_order.timestamp
+            sell_ts = sell_order.timestamp
+            timestamp = buy_ts if buy_ts >= sell_ts else sell_ts  # max() without the call
+            
+            # Use object pool to reduce GC pressure
+            if pool:
+                trade = pool.pop()
+                trade.trade_id = trade_id
+                trade.buy_order_id = buy_order.id
+                trade.sell_order_id = sell_order.id
+                trade.price = price
+                trade.quantity = quantity
+                trade.symbol = symbol
+                trade.timestamp = timestamp
+            else:
+                # Positional: keyword binding is measurable at per-fill rates
+                trade = Trade(trade_id, buy_order.id, sell_order.id, price, quantity,
+                              symbol, timestamp)
+            
+            # Add to trade history
+            trades_append(trade)
             
-        return trade
+            # Invoke callback if registered
+            if callback is not None:
+                callback(trade)
+                
+            return trade
+        
+        return execute_trade
     
     def get_trades(self, symbol: Optional[str] = None, limit: int = 100, clear: bool = False) -> List[Trade]:
         """
@@ -91,24 +118,43 @@ class TradeExecutor:
         Returns:
             List of trades
         """
-        # Filter by symbol if needed
-        if symbol is None:
-            result = self.trades
-        else:
-            result = [t for t in self.trades if t.symbol == symbol]
-        
-        # Apply limit if needed
-        if limit < len(result):
-            result = result[-limit:]
-        else:
-            result = result.copy()
+        # Walk back from the newest trade, so only the returned window is visited
+        # (plus any non-matching trades in between when filtering by symbol)
+        newest_first = reversed(self.trades)
+        if symbol is not None:
+            newest_first = (t for t in newest_first if t.symbol == symbol)
+        result = list(islice(newest_first, limit))
+        result.reverse()
             
         # Clear internal trades list if requested
         if clear:
-            self.trades = []
+            self.trades.clear()
             
         return result
     
+    def get_trade_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Get the trade history as NumPy columns, oldest first, for vectorized
+        statistics (e.g. VWAP as a dot product).
+        
+        The columns are built on demand in one pass per field, so fills never pay
+        for array writes.
+        
+        Returns:
+            Dictionary of trade_id, buy_order_id, sell_order_id, price, quantity and
+            timestamp arrays
+        """
+        trades = self.trades
+        n = len(trades)
+        return {
+            "trade_id": np.fromiter((t.trade_id for t in trades), np.int64, n),
+            "buy_order_id": np.fromiter((t.buy_order_id for t in trades), np.int64, n),
+            "sell_order_id": np.fromiter((t.sell_order_id for t in trades), np.int64, n),
+            "price": np.fromiter((t.price for t in trades), np.float64, n),
+            "quantity": np.fromiter((t.quantity for t in trades), np.float64, n),
+            "timestamp": np.fromiter((t.timestamp for t in trades), np.int64, n),
+        }
+    
     def recycle_trades(self, trades: List[Trade]) -> None:
         """
         Return trade objects to the pool for reuse.
@@ -125,10 +171,14 @@ class TradeExecutor:
         remaining_capacity = self._max_trade_pool_size - len(self._trade_pool)
         trades_to_add = trades[:remaining_capacity]
         
-        # Remove trades from the internal list if they're there
-        for trade in trades_to_add:
-            if trade in self.trades:
-                self.trades.remove(trade)
+        # Remove trades from the internal list if they're there, in one filtering pass
+        # over the history keyed by identity rather than a scan per recycled trade
+        trades = self.trades
+        if trades:
+            recycled = {id(trade) for trade in trades_to_add}
+            kept = [trade for trade in trades if id(trade) not in recycled]
+            trades.clear()
+            trades.extend(kept)
                 
         # Add to pool
         self._trade_pool.extend(trades_to_add) 
\ No newline at end of file
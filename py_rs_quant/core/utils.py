@@ -2,13 +2,16 @@
 Utility functions for the matching engine.
 Includes performance optimizations using numba if available.
 """
+import gc
 import logging
-from typing import Dict, Tuple, Optional, List, Any
-from collections import OrderedDict
+import math
+from contextlib import contextmanager
+from typing import Dict, Hashable, Tuple, Optional, List, Any
+from itertools import islice
 
 # Try to import numba for JIT compilation
 try:
-    from numba import njit, jit
+    from numba import njit, jit, prange
     import numpy as np
     NUMBA_AVAILABLE = True
 except ImportError:
@@ -19,6 +22,7 @@ except ImportError:
         return func
     def jit(func, **kwargs):
         return func
+    prange = range
     # Dummy NumPy replacement
     import array
     class DummyNumPy:
@@ -62,38 +66,208 @@ def update_order_status(order_remaining: float, partial_status: int, filled_stat
     """Update an order's status based on remaining quantity."""
     return filled_status if order_remaining <= 0 else partial_status
 
+@njit(cache=True, nogil=True, parallel=True)
+def group_price_levels(keys, quantities):
+    """
+    Group a batch of price keys into price levels.
+
+    Returns the stable sort order of the batch, the start offset of each level
+    within that order (with a trailing end offset) and the total quantity per level.
+    Levels are independent, so their totals are reduced in parallel.
+    """
+    n = len(keys)
+    order = np.argsort(keys, kind='mergesort')  # Stable: keeps arrival order within a level
+
+    # Count distinct levels to size the offsets array exactly
+    num_levels = 1 if n > 0 else 0
+    for i in range(1, n):
+        if keys[order[i]] != keys[order[i - 1]]:
+            num_levels += 1
+
+    starts = np.empty(num_levels + 1, dtype=np.int64)
+    level = 0
+    for i in range(n):
+        if i == 0 or keys[order[i]] != keys[order[i - 1]]:
+            starts[level] = i
+            level += 1
+    starts[num_levels] = n
+
+    totals = np.zeros(num_levels, dtype=np.float64)
+    for lvl in prange(num_levels):
+        total = 0.0
+        for i in range(starts[lvl], starts[lvl + 1]):
+            total += quantities[order[i]]
+        totals[lvl] = total
+
+    return order, starts, totals
+
+@njit(cache=True)
+def summarize_levels(buy_prices, sell_prices):
+    """
+    Compute spread and mid price from best-first level prices for a snapshot.
+    Both are NaN when either side of the book is empty.
+    """
+    if len(buy_prices) == 0 or len(sell_prices) == 0:
+        return math.nan, math.nan
+    best_bid = buy_prices[0]
+    best_ask = sell_prices[0]
+    return best_ask - best_bid, (best_ask + best_bid) / 2
+
+@njit(cache=True)
+def passive_run_end(is_buy, is_limit, prices, quantities, start, best_bid, best_ask):
+    """
+    Find where the run of orders from start that rest without matching ends.
+    
+    Walks the batch in submission order, tightening the best bid/ask as each
+    passive order would rest. The run stops at the first market order, empty order
+    or limit order crossing the book or an earlier order in the run.
+    """
+    n = len(prices)
+    i = start
+    while i < n:
+        if not is_limit[i] or quantities[i] <= 0:
+            break
+        price = prices[i]
+        if is_buy[i]:
+            if price >= best_ask:
+                break
+            if price > best_bid:
+                best_bid = price
+        else:
+            if price <= best_bid:
+                break
+            if price < best_ask:
+                best_ask = price
+        i += 1
+    return i
+
+@njit(cache=True)
+def walk_prices(prices, symbol_idx, normals, volatility, reversion, means, trends,
+                tick_size, inv_tick):
+    """
+    Step each order's symbol price once, in order, and return the price each order
+    sees; prices holds the current price per symbol and is updated in place.
+    
+    A step is p + reversion * (mean - p) + p * trend + p * volatility * z, snapped to
+    the tick grid and floored at one tick. Every step depends on the last one for the
+    same symbol, so the walk is sequential.
+    """
+    n = len(symbol_idx)
+    out = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        sym = symbol_idx[i]
+        price = prices[sym]
+        price = (price + reversion * (means[sym] - price) + price * trends[sym]
+                 + price * volatility * normals[i])
+        price = np.rint(price * inv_tick) * tick_size
+        if price < tick_size:
+            price = tick_size
+        prices[sym] = price
+        out[i] = price
+    return out
+
+@njit(cache=True)
+def check_order_core(position, order_size, price, position_limit, size_limit,
+                     exposure, max_exposure, reference_price, low_factor, high_factor):
+    """
+    Run the pre-trade risk checks on plain floats and return a mask of the failures.
+    
+    Bit 0 is the position limit, bit 1 the order size, bit 2 the exposure and bit 3
+    the price tolerance; every check is evaluated, with no early exit. The price
+    must lie within [reference_price * low_factor, reference_price * high_factor],
+    the factors being 1 -/+ the tolerance, so no division is needed. An absent
+    limit is passed as inf and an absent reference price as NaN, so the
+    corresponding check can never fail.
+    """
+    return (int(abs(position + order_size) > position_limit)
+            | int(abs(order_size) > size_limit) << 1
+            | int(exposure + abs(order_size * price) > max_exposure) << 2
+            | int((price < reference_price * low_factor)
+                  | (price > reference_price * high_factor)) << 3)
+
+@contextmanager
+def gc_paused():
+    """
+    Pause the cyclic garbage collector for a bulk allocation.
+    
+    Resting orders are linked to each other, so every collection triggered by a
+    large batch of new orders re-traverses the whole book.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+# Sentinel for cache misses, distinct from a cached None
+_MISSING = object()
+
+_I32_OFFSET = 1 << 31
+
+def pack_key(high: int, low: int) -> int:
+    """
+    Combine two ints into one int key for ArrayCache, e.g. an order id and a price tick.
+    
+    The pair is packed into disjoint bits, so distinct pairs never share a key and a
+    cache hit can't return another pair's value, which a hashed mix can't promise.
+    low is stored offset by 2**31, so negative (buy side) ticks pack too.
+    
+    Raises:
+        ValueError: If low does not fit in a signed 32-bit int
+    """
+    low += _I32_OFFSET
+    if not 0 <= low < 1 << 32:
+        raise ValueError(f"low must be in [-2**31, 2**31), got {low - _I32_OFFSET}")
+    return (high << 32) | low
+
 # Cache implementation
 class LRUCache:
-    """Efficient LRU cache implementation using OrderedDict."""
+    """
+    Efficient LRU cache implementation using an insertion-ordered dict.
+    
+    The cache never holds more than capacity items; a put into a full cache evicts
+    the least recently used sixteenth of it rather than a single item. Keys can be
+    any hashable.
+    """
     __slots__ = ['capacity', 'cache']
     
     def __init__(self, capacity: int = 1000):
         """Initialize the cache with a maximum capacity."""
         self.capacity = capacity
-        # OrderedDict maintains insertion order and provides O(1) operations
-        self.cache = OrderedDict()
+        # Plain dicts keep insertion order in a compact table, about half the size of
+        # an OrderedDict with its per-entry links, so recency is just insertion order
+        self.cache = {}
     
-    def get(self, key: Tuple[int, Any]) -> Optional[Any]:
+    def get(self, key: Hashable) -> Optional[Any]:
         """Get an item from the cache."""
-        if key not in self.cache:
+        cache = self.cache
+        # One probe on a miss
+        value = cache.get(key, _MISSING)
+        if value is _MISSING:
             return None
         
-        # Move to end (most recently used position)
-        value = self.cache.pop(key)
-        self.cache[key] = value
+        # Reinsert at the end (most recently used position)
+        del cache[key]
+        cache[key] = value
         return value
     
-    def put(self, key: Tuple[int, Any], value: Any) -> None:
+    def put(self, key: Hashable, value: Any) -> None:
         """Add an item to the cache."""
-        # Remove if already exists
-        if key in self.cache:
-            self.cache.pop(key)
-        # Remove least recently used item if at capacity
-        elif len(self.cache) >= self.capacity:
-            self.cache.popitem(last=False)  # Remove first item (oldest)
+        cache = self.cache
+        if key in cache:
+            # Drop the old entry so the reinsert below lands at the end
+            del cache[key]
+        elif len(cache) >= self.capacity:
+            # Evict the least recently used slice at once: deletions leave dummies at
+            # the front of the dict table that iteration has to skip, so one
+            # eviction per insert would rescan them every time
+            for old in list(islice(cache, self.capacity // 16 or 1)):
+                del cache[old]
             
         # Add item (will be at the end - most recently used)
-        self.cache[key] = value
+        cache[key] = value
     
     def clear(self) -> None:
         """Clear the cache."""
@@ -110,38 +284,72 @@ class LRUCache:
             "capacity": self.capacity
         }
 
+# Fibonacci hashing multiplier: 2**64 divided by the golden ratio, made odd
+_FIB_MULTIPLIER = 0x9E3779B97F4A7C15
+_U64_MASK = (1 << 64) - 1
+
 # Ultra-fast implementation of a fixed-size integer keyed cache
 class ArrayCache:
-    """Cache optimized for integer keys within a fixed range."""
-    __slots__ = ['values', 'size', 'hit_count', 'miss_count']
+    """
+    Cache optimized for integer keys within a fixed range.
+    
+    Slots are grouped into sets of up to 8 ways, so keys that share a set evict each
+    other only once all its ways are taken, and then round-robin. The slot count is
+    rounded up to a power of two, and a key's set is the top bits of its Fibonacci
+    hash (shift is always 64 - log2 of the set count). Consecutive ids still land in
+    distinct sets, while ids taken at a power-of-two stride no longer pile into a
+    few sets as they would under a plain mask or modulo.
+    """
+    __slots__ = ['buckets', 'victims', 'size', 'ways', 'shift', 'hit_count', 'miss_count']
     
-    def __init__(self, size: int = 1024):
-        """Initialize with a fixed size."""
-        self.values = [None] * size
-        self.size = size
+    def __init__(self, size: int = 1024, ways: int = 8):
+        """Initialize with a fixed size, rounded up to a power of two."""
+        if size <= 0:
+            raise ValueError("Cache size must be positive")
+        if ways <= 0 or ways & (ways - 1):
+            raise ValueError("Cache ways must be a positive power of two")
+        self.size = 1 << (size - 1).bit_length()
+        self.ways = min(ways, self.size)
+        num_sets = self.size // self.ways
+        self.shift = 64 - (num_sets.bit_length() - 1)
         self.hit_count = 0
         self.miss_count = 0
+        self.clear()
     
     def get(self, key: int) -> Optional[Any]:
         """Get a value by key."""
-        index = key % self.size
-        value = self.values[index]
-        
-        if value is not None and value[0] == key:
-            self.hit_count += 1
-            return value[1]
+        for slot in self.buckets[((key * _FIB_MULTIPLIER) & _U64_MASK) >> self.shift]:
+            if slot is None:
+                break  # Ways fill front to back, so the rest of the set is empty
+            if slot[0] == key:
+                self.hit_count += 1
+                return slot[1]
         
         self.miss_count += 1
         return None
     
     def put(self, key: int, value: Any) -> None:
         """Store a value by key."""
-        index = key % self.size
-        self.values[index] = (key, value)
+        index = ((key * _FIB_MULTIPLIER) & _U64_MASK) >> self.shift
+        bucket = self.buckets[index]
+        
+        # Overwrite the key's own slot or take the first free one
+        for way, slot in enumerate(bucket):
+            if slot is None or slot[0] == key:
+                bucket[way] = (key, value)
+                return
+        
+        # Set is full: evict its ways in turn
+        victims = self.victims
+        way = victims[index]
+        bucket[way] = (key, value)
+        victims[index] = (way + 1) & (self.ways - 1)
     
     def clear(self) -> None:
         """Clear the cache."""
-        self.values = [None] * self.size
+        num_sets = self.size // self.ways
+        self.buckets = [[None] * self.ways for _ in range(num_sets)]
+        self.victims = [0] * num_sets
         
     def hit_ratio(self) -> float:
         """Calculate hit ratio."""
@@ -149,35 +357,70 @@ class ArrayCache:
         return self.hit_count / total if total > 0 else 0.0
 
 # JIT-compiled functions for critical paths
-@jit(nopython=True)
+@njit(cache=True, inline='always')
 def calculate_trade_qty(buy_remaining: float, sell_remaining: float) -> float:
     """Calculate trade quantity efficiently."""
-    return min(buy_remaining, sell_remaining)
+    # Same idiom as min_quantity: no builtin call when running uncompiled
+    return buy_remaining if buy_remaining < sell_remaining else sell_remaining
 
 
-@jit(nopython=True)
+@njit(fastmath=True, cache=True, boundscheck=False)
 def calculate_price_stats(prices, quantities):
-    """Calculate price statistics efficiently."""
-    if len(prices) == 0:
-        return 0.0, 0.0, 0.0, 0.0, 0.0
+    """
+    Calculate price statistics efficiently from float64 price and quantity arrays.
     
-    # Calculate weighted price
-    total_qty = np.sum(quantities)
-    if total_qty <= 0:
-        return 0.0, 0.0, 0.0, 0.0, 0.0
+    Returns (min, max, mean, weighted mean, weighted std dev, total quantity).
+    
+    Min, max and the plain and weighted sums are reduced in one pass with no
+    temporary arrays; the weighted variance needs the weighted mean, so it takes a
+    second pass.
+    """
+    n = len(prices)
+    if n == 0:
+        return 0.0, 0.0, 0.0, 0.0, 0.0, 0.0
     
-    weighted_price = np.sum(prices * quantities) / total_qty
+    total_qty = 0.0
+    weighted_sum = 0.0
+    price_sum = 0.0
+    min_price = prices[0]
+    max_price = prices[0]
+    for i in range(n):
+        price = prices[i]
+        qty = quantities[i]
+        total_qty += qty
+        weighted_sum += price * qty
+        price_sum += price
+        if price < min_price:
+            min_price = price
+        if price > max_price:
+            max_price = price
+    
+    if total_qty <= 0:
+        return 0.0, 0.0, 0.0, 0.0, 0.0, total_qty
     
-    # Calculate other stats
-    min_price = np.min(prices)
-    max_price = np.max(prices)
-    mean_price = np.mean(prices)
+    weighted_price = weighted_sum / total_qty
+    mean_price = price_sum / n
     
     # Calculate weighted standard deviation
-    if len(prices) > 1:
-        variance = np.sum(quantities * (prices - weighted_price) ** 2) / total_qty
-        std_dev = np.sqrt(variance)
+    if n > 1:
+        variance = 0.0
+        for i in range(n):
+            diff = prices[i] - weighted_price
+            variance += quantities[i] * diff * diff
+        std_dev = math.sqrt(variance / total_qty)
     else:
         std_dev = 0.0
     
-    return min_price, max_price, mean_price, weighted_price, std_dev 
\ No newline at end of file
+    return min_price, max_price, mean_price, weighted_price, std_dev, total_qty
+
+
+# Ahead-of-time compiled kernels, if built (python -m py_rs_quant.core._kernels_build),
+# replace the JIT dispatchers above so the first call in a process skips compilation
+try:
+    from py_rs_quant.core._kernels import (
+        min_quantity, calculate_trade_qty, update_quantities, calculate_match_price,
+        update_order_status, summarize_levels, passive_run_end, calculate_price_stats,
+        check_order_core,
+    )
+except ImportError:
+    pass
@@ -1,14 +1,18 @@
 """
 Risk management module for pre-trade risk checks.
 """
-from enum import Enum
-from typing import Dict, List, Optional, Union
+from enum import IntEnum
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 import logging
 
+import numpy as np
+
+from py_rs_quant.core.utils import check_order_core
+
 logger = logging.getLogger(__name__)
 
 
-class RiskCheckResult(Enum):
+class RiskCheckResult(IntEnum):
     PASSED = 1
     FAILED_POSITION_LIMIT = 2
     FAILED_ORDER_SIZE = 3
@@ -16,10 +20,52 @@ class RiskCheckResult(Enum):
     FAILED_PRICE_TOLERANCE = 5
 
 
+_FAILED_POSITION_LIMIT = RiskCheckResult.FAILED_POSITION_LIMIT
+_FAILED_ORDER_SIZE = RiskCheckResult.FAILED_ORDER_SIZE
+_FAILED_EXPOSURE = RiskCheckResult.FAILED_EXPOSURE
+_FAILED_PRICE_TOLERANCE = RiskCheckResult.FAILED_PRICE_TOLERANCE
+
+# Result for each failure mask from check_order_core (bit 0 position limit, bit 1
+# order size, bit 2 exposure, bit 3 price tolerance): the lowest failed bit wins,
+# which is the order check_order has always run the checks in
+_FAILURE_ORDER = (_FAILED_POSITION_LIMIT, _FAILED_ORDER_SIZE, _FAILED_EXPOSURE,
+                  _FAILED_PRICE_TOLERANCE)
+_RESULTS = tuple(
+    next((result for bit, result in enumerate(_FAILURE_ORDER) if mask >> bit & 1),
+         RiskCheckResult.PASSED)
+    for mask in range(1 << len(_FAILURE_ORDER))
+)
+_RESULT_CODES = np.array(_RESULTS, dtype=np.int8)
+_RESULT_BY_CODE = {result.value: result for result in RiskCheckResult}
+# Limits that can never be exceeded and a reference price no price falls outside of
+_NO_LIMIT = float('inf')
+_NO_REFERENCE = float('nan')
+
+def _number_symbols(symbols: Sequence[str]) -> Tuple[Dict[str, int], np.ndarray]:
+    """Number symbols in order of first appearance; returns the ids and one id per entry."""
+    if isinstance(symbols, np.ndarray):
+        symbols = symbols.tolist()  # Plain str keys rather than np.str_
+    symbol_ids: Dict[str, int] = {}
+    intern = symbol_ids.setdefault
+    ids = np.fromiter([intern(symbol, len(symbol_ids)) for symbol in symbols],
+                      dtype=np.intp, count=len(symbols))
+    return symbol_ids, ids
+
+
+def decode_results(codes: np.ndarray) -> List[RiskCheckResult]:
+    """Convert the codes returned by check_orders_batch to RiskCheckResult members."""
+    return [_RESULT_BY_CODE[code] for code in codes.tolist()]
+
+
 class RiskManager:
     """
     Risk management class to perform pre-trade risk checks for orders.
     """
+    __slots__ = (
+        'max_position_size', 'max_order_size', '_max_exposure', '_exposure_limit',
+        '_price_tolerance', '_price_low_factor', '_price_high_factor',
+        'positions', 'current_exposure', 'reference_prices',
+    )
     
     def __init__(
         self,
@@ -49,6 +95,30 @@ class RiskManager:
         # Track reference prices
         self.reference_prices: Dict[str, float] = {}
     
+    @property
+    def max_exposure(self) -> Optional[float]:
+        """Maximum exposure in base currency, or None for no limit."""
+        return self._max_exposure
+    
+    @max_exposure.setter
+    def max_exposure(self, max_exposure: Optional[float]) -> None:
+        self._max_exposure = max_exposure
+        # Resolved here rather than on every check: no limit is one never exceeded
+        self._exposure_limit = _NO_LIMIT if max_exposure is None else max_exposure
+    
+    @property
+    def price_tolerance(self) -> float:
+        """Maximum allowed deviation from reference price (0.1 = 10%)."""
+        return self._price_tolerance
+    
+    @price_tolerance.setter
+    def price_tolerance(self, price_tolerance: float) -> None:
+        self._price_tolerance = price_tolerance
+        # A price passes within [reference * low, reference * high], so the checks
+        # multiply rather than divide by the reference price
+        self._price_low_factor = 1.0 - price_tolerance
+        self._price_high_factor = 1.0 + price_tolerance
+    
     def set_position(self, symbol: str, size: float) -> None:
         """Set the current position for a symbol."""
         self.positions[symbol] = size
@@ -75,10 +145,12 @@ class RiskManager:
         new_position = current_position + order_size
         
         if abs(new_position) > self.max_position_size[symbol]:
-            logger.warning(
-                f"Position limit exceeded for {symbol}: current={current_position}, "
-                f"order={order_size}, new={new_position}, limit={self.max_position_size[symbol]}"
-            )
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning(
+                    "Position limit exceeded for %s: current=%s, order=%s, new=%s, limit=%s",
+                    symbol, current_position, order_size, new_position,
+                    self.max_position_size[symbol]
+                )
             return False
         
         return True
@@ -98,10 +170,11 @@ class RiskManager:
             return True  # No limit set
         
         if abs(order_size) > self.max_order_size[symbol]:
-            logger.warning(
-                f"Order size limit exceeded for {symbol}: order={order_size}, "
-                f"limit={self.max_order_size[symbol]}"
-            )
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning(
+                    "Order size limit exceeded for %s: order=%s, limit=%s",
+                    symbol, order_size, self.max_order_size[symbol]
+                )
             return False
         
         return True
@@ -125,10 +198,11 @@ class RiskManager:
         new_exposure = self.current_exposure + order_exposure
         
         if new_exposure > self.max_exposure:
-            logger.warning(
-                f"Exposure limit exceeded: current={self.current_exposure}, "
-                f"order={order_exposure}, new={new_exposure}, limit={self.max_exposure}"
-            )
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning(
+                    "Exposure limit exceeded: current=%s, order=%s, new=%s, limit=%s",
+                    self.current_exposure, order_exposure, new_exposure, self.max_exposure
+                )
             return False
         
         return True
@@ -148,14 +222,16 @@ class RiskManager:
             return True  # No reference price available
         
         reference_price = self.reference_prices[symbol]
-        deviation = abs(price - reference_price) / reference_price
         
-        if deviation > self.price_tolerance:
-            logger.warning(
-                f"Price tolerance exceeded for {symbol}: order_price={price}, "
-                f"reference={reference_price}, deviation={deviation:.2%}, "
-                f"tolerance={self.price_tolerance:.2%}"
-            )
+        if (price < reference_price * self._price_low_factor
+                or price > reference_price * self._price_high_factor):
+            if logger.isEnabledFor(logging.WARNING):
+                deviation = abs(price - reference_price) / reference_price
+                logger.warning(
+                    "Price tolerance exceeded for %s: order_price=%s, reference=%s, "
+                    "deviation=%.2f%%, tolerance=%.2f%%",
+                    symbol, price, reference_price, deviation * 100, self.price_tolerance * 100
+                )
             return False
         
         return True
@@ -179,23 +255,111 @@ class RiskManager:
         Returns:
             RiskCheckResult enum indicating whether the order passed risk checks
         """
-        # Check position limits
-        if not self.check_position_limit(symbol, order_size):
-            return RiskCheckResult.FAILED_POSITION_LIMIT
+        # One lookup per table, then all four checks in a single compiled call that
+        # returns the failure mask
+        result = _RESULTS[check_order_core(
+            self.positions.get(symbol, 0.0),
+            order_size,
+            price,
+            self.max_position_size.get(symbol, _NO_LIMIT),
+            self.max_order_size.get(symbol, _NO_LIMIT),
+            self.current_exposure,
+            self._exposure_limit,
+            self.reference_prices.get(symbol, _NO_REFERENCE) if check_price_tolerance else _NO_REFERENCE,
+            self._price_low_factor,
+            self._price_high_factor,
+        )]
+        
+        # Rejections are rare: rerun the failed check for its detailed warning
+        if result is _FAILED_POSITION_LIMIT:
+            self.check_position_limit(symbol, order_size)
+        elif result is _FAILED_ORDER_SIZE:
+            self.check_order_size(symbol, order_size)
+        elif result is _FAILED_EXPOSURE:
+            self.check_exposure(symbol, order_size, price)
+        elif result is _FAILED_PRICE_TOLERANCE:
+            self.check_price_tolerance(symbol, price)
+        return result
+    
+    def check_orders_batch(
+        self,
+        symbols: Sequence[str],
+        order_sizes: np.ndarray,  # Positive for buys, negative for sells
+        prices: np.ndarray,
+        check_price_tolerance: Union[bool, np.ndarray] = True
+    ) -> np.ndarray:
+        """
+        Run all risk checks for a batch of orders as array operations.
+        
+        Each order is checked on its own against the current positions and exposure,
+        exactly as check_order would; orders in the batch do not count against each
+        other. Limits are looked up once per distinct symbol.
+        
+        Args:
+            symbols: The trading symbol of each order; a NumPy str array is matched
+                against the known symbols without a Python-level pass over the batch
+            order_sizes: Order sizes (positive for buys, negative for sells)
+            prices: Order prices
+            check_price_tolerance: Whether to check price tolerance, for the whole batch
+                or per order (e.g. False for market orders)
+            
+        Returns:
+            int8 array of RiskCheckResult values, one per order; the codes are the
+            enum values, so the array can go straight into further numba kernels,
+            and decode_results turns it into members
+            
+        Raises:
+            ValueError: If the inputs differ in length
+        """
+        order_sizes = np.asarray(order_sizes, dtype=np.float64)
+        prices = np.asarray(prices, dtype=np.float64)
+        check_tolerance = np.broadcast_to(np.asarray(check_price_tolerance, dtype=bool),
+                                          order_sizes.shape)
+        if not len(symbols) == len(order_sizes) == len(prices):
+            raise ValueError("symbols, order_sizes and prices must have the same length")
         
-        # Check order size
-        if not self.check_order_size(symbol, order_size):
-            return RiskCheckResult.FAILED_ORDER_SIZE
+        # Gather each limit from a table with one row per symbol; a missing limit is
+        # inf and a missing reference price NaN, so those checks never fail
+        if isinstance(symbols, np.ndarray) and symbols.dtype.kind == 'U':
+            rows, ids = self._match_known_symbols(symbols)
+        else:
+            rows, ids = _number_symbols(symbols)
+        def per_order(values, default):
+            return np.fromiter([values.get(symbol, default) for symbol in rows],
+                               dtype=np.float64, count=len(rows))[ids]
+        position_limit = per_order(self.max_position_size, np.inf)
+        size_limit = per_order(self.max_order_size, np.inf)
+        position = per_order(self.positions, 0.0)
+        reference = per_order(self.reference_prices, np.nan)
         
-        # Check exposure
-        if not self.check_exposure(symbol, order_size, price):
-            return RiskCheckResult.FAILED_EXPOSURE
+        # Same failure mask as check_order_core; bool arrays view as 0/1 bytes
+        mask = ((np.abs(position + order_sizes) > position_limit).view(np.uint8)
+                | (np.abs(order_sizes) > size_limit).view(np.uint8) << 1
+                | (self.current_exposure + np.abs(order_sizes * prices) > self._exposure_limit).view(np.uint8) << 2
+                | (check_tolerance & ((prices < reference * self._price_low_factor)
+                                      | (prices > reference * self._price_high_factor))).view(np.uint8) << 3)
+        results = _RESULT_CODES[mask]
         
-        # Check price tolerance if required
-        if check_price_tolerance and not self.check_price_tolerance(symbol, price):
-            return RiskCheckResult.FAILED_PRICE_TOLERANCE
+        rejected = np.count_nonzero(results != RiskCheckResult.PASSED)
+        if rejected:
+            logger.warning("Risk checks rejected %d of %d orders in batch", rejected, len(results))
+        return results
+    
+    def _match_known_symbols(self, symbols: np.ndarray) -> Tuple[List[Optional[str]], np.ndarray]:
+        """
+        Find the row of each symbol in the sorted symbols that have a limit or state.
         
-        return RiskCheckResult.PASSED
+        Symbols with none of them all share an extra last row, None, that no dict has
+        an entry for. Returns the row symbols and one row id per entry.
+        """
+        known = sorted(set().union(self.max_position_size, self.max_order_size,
+                                   self.positions, self.reference_prices))
+        if not known:
+            return [None], np.zeros(len(symbols), dtype=np.intp)
+        table = np.array(known)
+        ids = np.searchsorted(table, symbols)
+        ids[table[np.minimum(ids, len(known) - 1)] != symbols] = len(known)
+        return known + [None], ids
     
     def update_after_fill(self, symbol: str, filled_size: float, filled_price: float) -> None:
         """
@@ -214,7 +378,47 @@ class RiskManager:
         fill_exposure = abs(filled_size * filled_price)
         self.current_exposure += fill_exposure
         
-        logger.info(
-            f"Position and exposure updated: symbol={symbol}, position={self.positions[symbol]}, "
-            f"exposure={self.current_exposure}"
-        ) 
\ No newline at end of file
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Position and exposure updated: symbol=%s, position=%s, exposure=%s",
+                symbol, self.positions[symbol], self.current_exposure
+            ) 
+    
+    def update_after_fills_batch(
+        self,
+        symbols: Sequence[str],
+        filled_sizes: np.ndarray,
+        filled_prices: np.ndarray
+    ) -> None:
+        """
+        Update positions and exposure after a batch of fills.
+        
+        Equivalent to calling update_after_fill for each fill, but the sizes are summed
+        per symbol first, so each position is written once per batch.
+        
+        Args:
+            symbols: The trading symbol of each fill
+            filled_sizes: Filled sizes (positive for buys, negative for sells)
+            filled_prices: Fill prices
+            
+        Raises:
+            ValueError: If the inputs differ in length
+        """
+        filled_sizes = np.asarray(filled_sizes, dtype=np.float64)
+        filled_prices = np.asarray(filled_prices, dtype=np.float64)
+        if not len(symbols) == len(filled_sizes) == len(filled_prices):
+            raise ValueError("symbols, filled_sizes and filled_prices must have the same length")
+        
+        symbol_ids, ids = _number_symbols(symbols)
+        net_sizes = np.bincount(ids, weights=filled_sizes, minlength=len(symbol_ids))
+        positions = self.positions
+        for symbol, net_size in zip(symbol_ids, net_sizes.tolist()):
+            positions[symbol] = positions.get(symbol, 0.0) + net_size
+        
+        self.current_exposure += float(np.abs(filled_sizes * filled_prices).sum())
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Positions and exposure updated for %d fills: exposure=%s",
+                len(filled_sizes), self.current_exposure
+            )
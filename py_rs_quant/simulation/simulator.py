@@ -1,19 +1,27 @@
 """
 Market simulation module for generating orders and simulating market activity.
 """
-import random
 import time
 import asyncio
 from enum import Enum
 from typing import Dict, List, Optional, Callable
 import logging
 
+import numpy as np
 
 from py_rs_quant.core.engine import MatchingEngine, OrderSide, OrderType, Order, Trade
+from py_rs_quant.core.utils import walk_prices
 from py_rs_quant.risk.manager import RiskManager, RiskCheckResult
 
 logger = logging.getLogger(__name__)
 
+# Simulation steps worth of random draws generated per refill
+_RANDOM_BATCH = 4096
+
+# Price model parameters shared by the per-order and batched price steps
+_MEAN_REVERSION_SPEED = 0.1  # Strength of mean reversion
+_STRESS_VOLATILITY_FACTOR = 3  # 3x normal volatility
+
 
 class SimulationMode(Enum):
     """Simulation modes for different market scenarios."""
@@ -64,9 +72,19 @@ class MarketSimulator:
         self.order_rate = order_rate
         self.volatility = volatility
         self.tick_size = tick_size
+        # Prices snap to the tick grid by multiplying with the inverse, not dividing
+        self._inv_tick = 1.0 / tick_size
         self.enable_market_orders = enable_market_orders
         self.market_order_pct = market_order_pct
         
+        # Price model for the mode, resolved once instead of by comparing modes per step
+        self._price_step = {
+            SimulationMode.RANDOM: self._price_step_random,
+            SimulationMode.MEAN_REVERTING: self._price_step_mean_reverting,
+            SimulationMode.TRENDING: self._price_step_trending,
+            SimulationMode.STRESS_TEST: self._price_step_stress,
+        }.get(mode, self._price_step_flat)
+        
         # Current reference prices
         self.current_prices = self.initial_prices.copy()
         
@@ -86,6 +104,32 @@ class MarketSimulator:
         # Callbacks
         self.on_order_callback = None
         self.on_trade_callback = None
+        
+        # Random draws are generated in batches, one entry per simulation step, and
+        # consumed by index so each step costs list lookups rather than RNG calls
+        self._rng = np.random.default_rng()
+        self._refill_randoms()
+    
+    def _refill_randoms(self):
+        """Draw the next batch of per-step random numbers."""
+        rng = self._rng
+        n = _RANDOM_BATCH
+        # Python lists of floats: indexing them is cheaper than numpy scalar access and
+        # keeps numpy scalars out of the prices and sizes handed to the engine
+        self._symbol_idx = rng.integers(0, len(self.symbols), n).tolist()
+        self._normals = rng.standard_normal(n).tolist()
+        self._expos = rng.exponential(1.0, n).tolist()
+        self._market_draws = rng.random(n).tolist()
+        self._side_draws = rng.random(n).tolist()
+        self._offsets = rng.uniform(0.01, 0.05, n).tolist()
+        self._size_factors = rng.lognormal(0.0, 0.5, n).tolist()
+        self._rn_idx = 0
+    
+    def _next_step(self) -> int:
+        """Index of the random draws for the next step, refilling when exhausted."""
+        if self._rn_idx >= _RANDOM_BATCH:
+            self._refill_randoms()
+        return self._rn_idx
     
     async def run(self, duration_seconds: int = 60, print_stats: bool = True):
         """
@@ -118,23 +162,120 @@ class MarketSimulator:
         
         logger.info(f"Running main simulation loop until {time.strftime('%H:%M:%S', time.localtime(end_time))}")
         
+        # Loop-invariant callables bound once; the order count is kept in a local and
+        # published at each progress log and on exit
+        now = time.time
+        sleep = asyncio.sleep
+        next_step = self._next_step
+        generate = self._generate_next_order
+        generated = self.orders_generated
+        
         try:
-            while self.running and time.time() < end_time:
-                # Calculate delay based on order rate (Poisson process)
-                delay = random.expovariate(self.order_rate)
-                await asyncio.sleep(delay)
+            # One clock read per order, taken after the sleep: it stamps the order and
+            # is the end check for the next iteration
+            t = now()
+            while self.running and t < end_time:
+                # Calculate delay based on order rate (Poisson process); the rate is
+                # read each time so it can be changed while running
+                await sleep(self._expos[next_step()] / self.order_rate)
+                t = now()
                 
                 # Generate and process a new order
-                await self._generate_next_order()
-                
-                # Update statistics
-                self.orders_generated += 1
+                await generate(int(t * 1000))
+                generated += 1
                 
                 # Periodically log progress
-                if self.orders_generated % 20 == 0:
-                    elapsed = time.time() - self.start_time
-                    remaining = max(0, end_time - time.time())
-                    logger.info(f"Generated {self.orders_generated} orders so far. {remaining:.1f}s remaining.")
+                if generated % 20 == 0:
+                    self.orders_generated = generated
+                    remaining = max(0, end_time - t)
+                    logger.info(f"Generated {generated} orders so far. {remaining:.1f}s remaining.")
+        except Exception as e:
+            logger.error(f"Error in simulation: {e}")
+            import traceback
+            logger.error(traceback.format_exc())
+        finally:
+            self.orders_generated = generated
+            self.running = False
+            self.end_time = time.time()
+            
+            if print_stats:
+                self.print_stats()
+    
+    async def run_batched(self, duration_seconds: int = 60, batch_size: int = 1024,
+                          print_stats: bool = True):
+        """
+        Run the simulation as fast as the engine accepts orders, in batches.
+        
+        Each batch draws every random variable as a numpy array, builds the orders as
+        columns and submits them with one batch_add_orders_np call, instead of one
+        asyncio.sleep and one engine call per order. Each order still steps its
+        symbol's price with the mode's price model, in a compiled walk over the batch,
+        and limit prices are set around the stepped price. Meant for stress tests and
+        throughput measurement rather than a realistic arrival process.
+        
+        Args:
+            duration_seconds: Duration in seconds to run
+            batch_size: Orders generated and submitted per batch
+            print_stats: Whether to print statistics after simulation
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        
+        self.running = True
+        self.start_time = time.time()
+        self.orders_generated = 0
+        self.trades_generated = 0
+        
+        logger.info(f"Starting batched simulation in {self.mode.name} mode for {duration_seconds} seconds")
+        
+        if self.risk_manager:
+            for symbol, price in self.current_prices.items():
+                self.risk_manager.update_reference_price(symbol, price)
+        
+        rng = self._rng
+        symbols = self.symbols
+        base_sizes = np.array([0.1 if symbol == "BTCUSD" else 1.0 for symbol in symbols])
+        end_time = self.start_time + duration_seconds
+        
+        try:
+            # One clock read per batch: the end check and the batch's order timestamp
+            t = time.time()
+            while self.running and t < end_time:
+                # One price step per order, like run(), walked in compiled code
+                symbol_idx = rng.integers(0, len(symbols), batch_size)
+                ref_prices = self._walk_batch_prices(symbol_idx, rng.standard_normal(batch_size))
+                
+                is_market = rng.random(batch_size) < self.market_order_pct if self.enable_market_orders \
+                    else np.zeros(batch_size, dtype=bool)
+                is_buy = rng.random(batch_size) < 0.5
+                quantities = np.round(base_sizes[symbol_idx] * rng.lognormal(0.0, 0.5, batch_size), 8)
+                
+                # Buys 1-5% below the reference price, sells 1-5% above, on the tick grid
+                offsets = rng.uniform(0.01, 0.05, batch_size)
+                prices = ref_prices * (1.0 + np.where(is_buy, -offsets, offsets))
+                prices = np.maximum(self.tick_size, np.round(prices * self._inv_tick) * self.tick_size)
+                prices[is_market] = np.nan
+                
+                if self.risk_manager:
+                    keep = self._risk_mask(symbol_idx, is_buy, is_market, prices, quantities,
+                                           ref_prices)
+                    symbol_idx, is_market, is_buy = symbol_idx[keep], is_market[keep], is_buy[keep]
+                    prices, quantities = prices[keep], quantities[keep]
+                
+                sides = np.where(is_buy, OrderSide.BUY.value, OrderSide.SELL.value).astype(np.uint8)
+                order_types = np.where(is_market, OrderType.MARKET.value, OrderType.LIMIT.value).astype(np.uint8)
+                timestamp = int(t * 1000)
+                order_ids = self.matching_engine.batch_add_orders_np(
+                    sides, order_types, prices, quantities, np.full(len(sides), timestamp, dtype=np.int64))
+                self.orders_generated += len(order_ids)
+                
+                if self.on_order_callback:
+                    self._emit_batch_orders(order_ids, symbol_idx, is_buy, is_market, prices,
+                                            quantities, timestamp)
+                
+                # Let other tasks (and stop()) run between batches
+                await asyncio.sleep(0)
+                t = time.time()
         except Exception as e:
             logger.error(f"Error in simulation: {e}")
             import traceback
@@ -146,6 +287,79 @@ class MarketSimulator:
             if print_stats:
                 self.print_stats()
     
+    def _walk_batch_prices(self, symbol_idx: np.ndarray, normals: np.ndarray) -> np.ndarray:
+        """
+        Step the symbol prices once per order of a batch and return each order's price.
+        
+        The mode's price model is expressed as walk_prices parameters, so the walk
+        matches _price_step_* one order at a time.
+        """
+        mode = self.mode
+        symbols = self.symbols
+        volatility = self.volatility
+        if mode == SimulationMode.STRESS_TEST:
+            volatility *= _STRESS_VOLATILITY_FACTOR
+        elif mode not in (SimulationMode.RANDOM, SimulationMode.MEAN_REVERTING,
+                          SimulationMode.TRENDING):
+            volatility = 0.0  # Unknown mode: prices stay put
+        reversion = _MEAN_REVERSION_SPEED if mode == SimulationMode.MEAN_REVERTING else 0.0
+        means = np.array([self.mean_levels[symbol] for symbol in symbols])
+        trends = np.array([self.trends[symbol] if mode == SimulationMode.TRENDING else 0.0
+                           for symbol in symbols])
+        
+        prices = np.array([self.current_prices[symbol] for symbol in symbols])
+        ref_prices = walk_prices(prices, symbol_idx, normals, volatility, reversion, means,
+                                 trends, self.tick_size, self._inv_tick)
+        
+        # Publish the last price per symbol; the risk manager follows order by order
+        # in _risk_mask
+        for symbol, price in zip(symbols, prices.tolist()):
+            self.current_prices[symbol] = price
+        return ref_prices
+    
+    def _risk_mask(self, symbol_idx, is_buy, is_market, prices, quantities,
+                   ref_prices) -> np.ndarray:
+        """
+        Run the per-order risk checks for a batch; True where the order passed.
+        
+        As in run(), each order is checked right after its price step, against its
+        own reference price.
+        """
+        symbols = self.symbols
+        update_reference_price = self.risk_manager.update_reference_price
+        check_order = self.risk_manager.check_order
+        keep = np.empty(len(quantities), dtype=bool)
+        for i, (sym, buy, market, price, ref_price, size) in enumerate(zip(
+                symbol_idx.tolist(), is_buy.tolist(), is_market.tolist(),
+                prices.tolist(), ref_prices.tolist(), quantities.tolist())):
+            symbol = symbols[sym]
+            update_reference_price(symbol, ref_price)
+            keep[i] = check_order(
+                symbol=symbol,
+                order_size=size if buy else -size,
+                price=ref_price if market else price,
+                check_price_tolerance=not market
+            ) == RiskCheckResult.PASSED
+        return keep
+    
+    def _emit_batch_orders(self, order_ids, symbol_idx, is_buy, is_market, prices,
+                           quantities, timestamp: int):
+        """Call the order callback for each order of a submitted batch."""
+        callback = self.on_order_callback
+        symbols = self.symbols
+        for order_id, sym, buy, market, price, size in zip(
+                order_ids.tolist(), symbol_idx.tolist(), is_buy.tolist(), is_market.tolist(),
+                prices.tolist(), quantities.tolist()):
+            callback(Order(
+                id=order_id,
+                side=OrderSide.BUY if buy else OrderSide.SELL,
+                order_type=OrderType.MARKET if market else OrderType.LIMIT,
+                price=None if market else price,
+                quantity=size,
+                timestamp=timestamp,
+                symbol=symbols[sym]
+            ))
+    
     def stop(self):
         """Stop the simulation."""
         self.running = False
@@ -161,9 +375,8 @@ class MarketSimulator:
         logger.info(f"Orders generated: {self.orders_generated}")
         logger.info(f"Orders per second: {self.orders_generated / elapsed_time:.2f}")
         
-        # Get trades from the matching engine
-        trades = self.matching_engine.get_trades()
-        num_trades = len(trades)
+        # The engine's running count; the retained trade history is capped
+        num_trades = self.matching_engine.get_trade_count()
         
         logger.info(f"Trades executed: {num_trades}")
         logger.info(f"Trades per second: {num_trades / elapsed_time:.2f}")
@@ -185,23 +398,33 @@ class MarketSimulator:
         # Register the callback with the matching engine
         self.matching_engine.register_trade_callback(callback)
     
-    async def _generate_next_order(self):
-        """Generate the next order based on the simulation mode."""
+    async def _generate_next_order(self, timestamp: Optional[int] = None):
+        """
+        Generate the next order based on the simulation mode.
+        
+        Args:
+            timestamp: Order timestamp (milliseconds since epoch) from the caller's
+                clock read, read here if not given
+        """
         try:
+            # This step's draws; _update_price reads the normal at the same index
+            step = self._next_step()
+            
             # Select a random symbol
-            symbol = random.choice(self.symbols)
+            symbol = self.symbols[self._symbol_idx[step]]
             
             # Update the current price based on the simulation mode
             self._update_price(symbol)
+            self._rn_idx = step + 1
             
             # Determine order type (market or limit)
-            is_market_order = self.enable_market_orders and random.random() < self.market_order_pct
+            is_market_order = self.enable_market_orders and self._market_draws[step] < self.market_order_pct
             
             # Determine order side (buy or sell)
-            is_buy = random.random() < 0.5
+            is_buy = self._side_draws[step] < 0.5
             
             # Determine order size (log-normal distribution)
-            size_factor = random.lognormvariate(0, 0.5)  # mean=1, stddev depends on the second parameter
+            size_factor = self._size_factors[step]  # mean=1, stddev depends on the second parameter
             base_size = 0.1 if symbol == "BTCUSD" else 1.0  # Example: smaller size for BTC, larger for ETH
             order_size = round(base_size * size_factor, 8)  # Round to 8 decimal places
             
@@ -219,15 +442,15 @@ class MarketSimulator:
                 if is_buy:
                     # Buy orders are typically below current price but not too far
                     # Change from lognormvariate to a smaller offset
-                    offset_factor = -random.uniform(0.01, 0.05)  # Small negative offset (1-5%)
+                    offset_factor = -self._offsets[step]  # Small negative offset (1-5%)
                 else:
                     # Sell orders are typically above current price but not too far
                     # Change from lognormvariate to a smaller offset
-                    offset_factor = random.uniform(0.01, 0.05)  # Small positive offset (1-5%)
+                    offset_factor = self._offsets[step]  # Small positive offset (1-5%)
                 
                 # Apply offset and round to tick size
                 price_offset = current_price * offset_factor
-                price = round((current_price + price_offset) / self.tick_size) * self.tick_size
+                price = round((current_price + price_offset) * self._inv_tick) * self.tick_size
                 
                 # Ensure price is positive
                 price = max(self.tick_size, price)
@@ -244,7 +467,9 @@ class MarketSimulator:
                 log_msg += f", price={price:.2f}"
             logger.info(log_msg)
             
-            # Apply risk checks if risk manager is available
+            # Apply risk checks if risk manager is available. Results are not memoized:
+            # they depend on the reference price, which moves every step, and on
+            # positions and exposure, which fills change
             if self.risk_manager:
                 order_size_signed = order_size if is_buy else -order_size
                 check_price = price if price is not None else self.current_prices[symbol]
@@ -261,7 +486,8 @@ class MarketSimulator:
                     return
             
             # Submit to matching engine with a timeout 
-            timestamp = int(time.time() * 1000)
+            if timestamp is None:
+                timestamp = time.time_ns() // 1_000_000
             order_id = None
             
             # Use a timeout to prevent potential hanging
@@ -299,46 +525,10 @@ class MarketSimulator:
     def _update_price(self, symbol: str):
         """Update the current price based on the simulation mode."""
         current_price = self.current_prices[symbol]
-        
-        if self.mode == SimulationMode.RANDOM:
-            # Simple random walk
-            price_change = current_price * self.volatility * random.normalvariate(0, 1)
-            new_price = current_price + price_change
-        
-        elif self.mode == SimulationMode.MEAN_REVERTING:
-            # Mean-reverting process (Ornstein-Uhlenbeck)
-            mean_level = self.mean_levels[symbol]
-            mean_reversion_speed = 0.1  # Strength of mean reversion
-            
-            # Calculate drift towards mean
-            drift = mean_reversion_speed * (mean_level - current_price)
-            
-            # Random component
-            diffusion = self.volatility * current_price * random.normalvariate(0, 1)
-            
-            # Update price
-            new_price = current_price + drift + diffusion
-        
-        elif self.mode == SimulationMode.TRENDING:
-            # Trending market with random walk
-            trend = self.trends[symbol]  # Percentage trend per step
-            trend_component = current_price * trend
-            random_component = current_price * self.volatility * random.normalvariate(0, 1)
-            
-            new_price = current_price + trend_component + random_component
-        
-        elif self.mode == SimulationMode.STRESS_TEST:
-            # High volatility stress test
-            stress_volatility = self.volatility * 3  # 3x normal volatility
-            price_change = current_price * stress_volatility * random.normalvariate(0, 1)
-            new_price = current_price + price_change
-        
-        else:
-            # Default to current price if unknown mode
-            new_price = current_price
+        new_price = self._price_step(symbol, current_price, self._normals[self._next_step()])
         
         # Ensure price is positive and rounded to tick size
-        new_price = max(self.tick_size, round(new_price / self.tick_size) * self.tick_size)
+        new_price = max(self.tick_size, round(new_price * self._inv_tick) * self.tick_size)
         
         # Update current price
         self.current_prices[symbol] = new_price
@@ -348,6 +538,41 @@ class MarketSimulator:
             self.risk_manager.update_reference_price(symbol, new_price)
         
         return new_price
+    
+    def _price_step_random(self, symbol: str, current_price: float, normal: float) -> float:
+        """Simple random walk."""
+        price_change = current_price * self.volatility * normal
+        return current_price + price_change
+    
+    def _price_step_mean_reverting(self, symbol: str, current_price: float, normal: float) -> float:
+        """Mean-reverting process (Ornstein-Uhlenbeck)."""
+        mean_level = self.mean_levels[symbol]
+        
+        # Calculate drift towards mean
+        drift = _MEAN_REVERSION_SPEED * (mean_level - current_price)
+        
+        # Random component
+        diffusion = self.volatility * current_price * normal
+        
+        return current_price + drift + diffusion
+    
+    def _price_step_trending(self, symbol: str, current_price: float, normal: float) -> float:
+        """Trending market with random walk."""
+        trend = self.trends[symbol]  # Percentage trend per step
+        trend_component = current_price * trend
+        random_component = current_price * self.volatility * normal
+        
+        return current_price + trend_component + random_component
+    
+    def _price_step_stress(self, symbol: str, current_price: float, normal: float) -> float:
+        """High volatility stress test."""
+        stress_volatility = self.volatility * _STRESS_VOLATILITY_FACTOR
+        price_change = current_price * stress_volatility * normal
+        return current_price + price_change
+    
+    def _price_step_flat(self, symbol: str, current_price: float, normal: float) -> float:
+        """Default to current price if unknown mode."""
+        return current_price
 
 
 async def run_simulation_example():
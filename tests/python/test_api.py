@@ -7,9 +7,9 @@ from fastapi.testclient import TestClient
 from py_rs_quant.api.application import app
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client():
-    """Create a test client for the application."""
+    """Create one test client for the application, shared by all tests."""
     return TestClient(app)
 
 
@@ -0,0 +1,415 @@
+"""
+Tests for the pure-Python order book and matcher.
+"""
+import random
+import sys
+import threading
+
+import pytest
+
+import numpy as np
+
+from py_rs_quant.core import MatchingEngine, OrderBook, OrderSide, OrderType
+
+
+@pytest.fixture
+def engine():
+    """Create a fresh matching engine."""
+    return MatchingEngine()
+
+
+def test_price_levels_sorted_best_first(engine):
+    """Buy levels are highest price first, sell levels lowest price first."""
+    for price in (99.0, 101.0, 100.0):
+        engine.add_limit_order(OrderSide.BUY, price, 1.0)
+    for price in (105.0, 103.0, 104.0):
+        engine.add_limit_order(OrderSide.SELL, price, 1.0)
+
+    buy_levels, sell_levels = engine.order_book.get_order_book_snapshot()
+    assert [price for price, _ in buy_levels] == [101.0, 100.0, 99.0]
+    assert [price for price, _ in sell_levels] == [103.0, 104.0, 105.0]
+    assert engine.order_book.get_best_bid() == 101.0
+    assert engine.order_book.get_best_ask() == 103.0
+
+
+def test_market_order_sweeps_multiple_levels(engine):
+    """A market order consumes levels in price order and removes emptied levels."""
+    engine.add_limit_order(OrderSide.SELL, 101.0, 1.0)
+    engine.add_limit_order(OrderSide.SELL, 102.0, 1.0)
+    engine.add_limit_order(OrderSide.SELL, 103.0, 1.0)
+
+    engine.add_market_order(OrderSide.BUY, 2.5)
+
+    trades = engine.get_trades()
+    assert [(t.price, t.quantity) for t in trades] == [(101.0, 1.0), (102.0, 1.0), (103.0, 0.5)]
+    _, sell_levels = engine.order_book.get_order_book_snapshot()
+    assert sell_levels == [(103.0, 0.5)]
+
+
+def test_limit_order_respects_price(engine):
+    """A limit order stops matching at its limit and rests the remainder."""
+    engine.add_limit_order(OrderSide.BUY, 100.0, 1.0)
+    engine.add_limit_order(OrderSide.BUY, 99.0, 1.0)
+
+    engine.add_limit_order(OrderSide.SELL, 99.5, 3.0)
+
+    trades = engine.get_trades()
+    assert [(t.price, t.quantity) for t in trades] == [(100.0, 1.0)]
+    buy_levels, sell_levels = engine.order_book.get_order_book_snapshot()
+    assert buy_levels == [(99.0, 1.0)]
+    assert sell_levels == [(99.5, 2.0)]
+
+
+def test_time_priority_within_level(engine):
+    """Orders at the same price fill in arrival order."""
+    first = engine.add_limit_order(OrderSide.SELL, 100.0, 1.0)
+    second = engine.add_limit_order(OrderSide.SELL, 100.0, 1.0)
+
+    engine.add_market_order(OrderSide.BUY, 1.0)
+
+    trades = engine.get_trades()
+    assert [t.sell_order_id for t in trades] == [first]
+    assert engine.get_order(second) is not None
+
+
+def test_cancel_removes_empty_level(engine):
+    """Cancelling the last order at a level removes the level."""
+    order_id = engine.add_limit_order(OrderSide.BUY, 100.0, 1.0)
+    engine.add_limit_order(OrderSide.BUY, 99.0, 1.0)
+
+    assert engine.cancel_order(order_id)
+    assert not engine.cancel_order(order_id)
+    assert engine.order_book.get_best_bid() == 99.0
+    assert engine.order_book.get_price_levels(OrderSide.BUY) == [(99.0, 1.0)]
+
+
+def test_add_orders_batch_groups_levels():
+    """Batch ingestion builds the same levels as adding orders one by one."""
+    book = OrderBook()
+    book.add_orders_batch(
+        prices=[100.0, 101.0, 100.0, 102.0],
+        qtys=[1.0, 2.0, 3.0, 4.0],
+        sides=[OrderSide.BUY.value, OrderSide.SELL.value, OrderSide.BUY.value, OrderSide.SELL.value],
+        ids=[1, 2, 3, 4],
+        tss=[0, 0, 0, 0],
+    )
+
+    buy_levels, sell_levels = book.get_order_book_snapshot()
+    assert buy_levels == [(100.0, 4.0)]
+    assert sell_levels == [(101.0, 2.0), (102.0, 4.0)]
+    assert [o.id for o in book.get_orders_at_price(OrderSide.BUY, 100.0)] == [1, 3]
+
+
+def test_batch_add_orders_np_matches_tuple_batch():
+    """Array batch submission produces the same ids, trades and book as the tuple API."""
+    rng = random.Random(3)
+    # A passive phase (bulk loaded in runs) followed by a crossing phase
+    rows = [(side, OrderType.LIMIT, price, float(rng.randint(1, 5)), i)
+            for i in range(200)
+            for side in [rng.choice((OrderSide.BUY, OrderSide.SELL))]
+            for price in [100.0 - rng.randint(1, 10) if side == OrderSide.BUY else 100.0 + rng.randint(1, 10)]]
+    rows += [(rng.choice((OrderSide.BUY, OrderSide.SELL)),
+              OrderType.MARKET if rng.random() < 0.1 else OrderType.LIMIT,
+              100.0 + rng.randint(-10, 10), float(rng.randint(1, 5)), i)
+             for i in range(200, 700)]
+
+    by_tuples = MatchingEngine()
+    tuple_ids = by_tuples.batch_add_orders(
+        [(side, kind, price if kind == OrderType.LIMIT else None, qty, ts, None)
+         for side, kind, price, qty, ts in rows])
+
+    by_arrays = MatchingEngine()
+    array_ids = by_arrays.batch_add_orders_np(
+        np.array([row[0].value for row in rows], dtype=np.int8),
+        np.array([row[1].value for row in rows], dtype=np.int8),
+        np.array([row[2] for row in rows]),
+        np.array([row[3] for row in rows]),
+        np.array([row[4] for row in rows]))
+
+    assert array_ids.tolist() == tuple_ids
+    assert [(t.buy_order_id, t.sell_order_id, t.price, t.quantity) for t in by_arrays.get_trades()] == \
+        [(t.buy_order_id, t.sell_order_id, t.price, t.quantity) for t in by_tuples.get_trades()]
+    assert by_arrays.order_book.get_order_book_snapshot() == by_tuples.order_book.get_order_book_snapshot()
+    with pytest.raises(ValueError):
+        by_arrays.batch_add_orders_np([3], [OrderType.LIMIT.value], [100.0], [1.0])
+
+def test_get_price_levels_np_matches_tuples(engine):
+    """The array snapshot matches the tuple snapshot and grows past its initial buffer."""
+    for i in range(100):
+        engine.add_limit_order(OrderSide.BUY, 100.0 - i, 1.0)
+
+    book = engine.order_book
+    levels = book.get_price_levels_np(OrderSide.BUY)
+    assert levels.shape == (100, 2)
+    assert levels[0].tolist() == [100.0, 1.0]
+    assert [tuple(row) for row in levels.tolist()] == book.get_price_levels(OrderSide.BUY)
+    assert book.get_price_levels_np(OrderSide.SELL).shape == (0, 2)
+
+
+def test_cancel_middle_of_queue_keeps_fifo(engine):
+    """Cancelling inside a level unlinks the order and keeps the others in arrival order."""
+    ids = [engine.add_limit_order(OrderSide.SELL, 100.0, 1.0) for _ in range(3)]
+
+    assert engine.cancel_order(ids[1])
+
+    book = engine.order_book
+    assert [o.id for o in book.get_orders_at_price(OrderSide.SELL, 100.0)] == [ids[0], ids[2]]
+    assert book.get_price_levels(OrderSide.SELL) == [(100.0, 2.0)]
+
+    engine.add_market_order(OrderSide.BUY, 2.0)
+    assert [t.sell_order_id for t in engine.get_trades()] == [ids[0], ids[2]]
+    assert book.get_best_ask() is None
+
+
+def test_get_level_arrays(engine):
+    """Level arrays follow time priority and reflect partial fills."""
+    ids = [engine.add_limit_order(OrderSide.BUY, 100.0, qty) for qty in (1.0, 2.0, 3.0)]
+    engine.add_market_order(OrderSide.SELL, 1.5)
+
+    order_ids, remaining = engine.order_book.get_level_arrays(OrderSide.BUY, 100.0)
+    assert order_ids.tolist() == ids[1:]
+    assert remaining.tolist() == [1.5, 3.0]
+    assert engine.order_book.get_level_arrays(OrderSide.SELL, 100.0)[0].size == 0
+
+
+def test_get_orders_array(engine):
+    """The structured export is best price first, in time priority within a level."""
+    first = engine.add_limit_order(OrderSide.BUY, 100.0, 1.0)
+    second = engine.add_limit_order(OrderSide.BUY, 100.0, 2.0)
+    best = engine.add_limit_order(OrderSide.BUY, 101.0, 3.0)
+    engine.add_market_order(OrderSide.SELL, 1.0)
+
+    orders = engine.order_book.get_orders_array(OrderSide.BUY)
+    assert orders["id"].tolist() == [best, first, second]
+    assert orders["price"].tolist() == [101.0, 100.0, 100.0]
+    assert orders["remaining"].tolist() == [2.0, 1.0, 2.0]
+    assert orders["side"].tolist() == [OrderSide.BUY.value] * 3
+    assert engine.order_book.get_orders_array(OrderSide.SELL).size == 0
+
+
+def test_trade_history_is_bounded():
+    """The trade history keeps only the newest trades, returned oldest first."""
+    from py_rs_quant.core import Order, TradeExecutor
+
+    executor = TradeExecutor(max_history=3)
+    buy = Order(1, OrderSide.BUY, OrderType.LIMIT, 100.0, 5.0)
+    sell = Order(2, OrderSide.SELL, OrderType.LIMIT, 100.0, 5.0)
+    for _ in range(5):
+        executor.execute_trade(buy, sell, 100.0, 1.0)
+
+    assert [t.trade_id for t in executor.get_trades(limit=2)] == [4, 5]
+    assert [t.trade_id for t in executor.get_trades(clear=True)] == [3, 4, 5]
+    assert executor.get_trades() == []
+
+
+def test_trade_count_outlives_history(engine):
+    """The engine's trade count keeps counting after the history is drained."""
+    for _ in range(3):
+        engine.add_limit_order(OrderSide.SELL, 101.0, 1.0)
+    engine.add_market_order(OrderSide.BUY, 2.0)
+    engine.get_trades()
+    engine.add_market_order(OrderSide.BUY, 1.0)
+
+    assert len(engine.get_trade_arrays()["trade_id"]) == 1
+    assert engine.get_trade_count() == 3
+
+
+def test_tick_grid_matches_default_book():
+    """A tick grid book produces the same trades and levels as the default book."""
+    import random
+
+    rng = random.Random(7)
+    default = MatchingEngine()
+    ticked = MatchingEngine(tick_size=0.5, min_price=90.0, max_price=110.0)
+    live_ids = []
+    for _ in range(2000):
+        action = rng.random()
+        if action < 0.1 and live_ids:
+            order_id = live_ids.pop(rng.randrange(len(live_ids)))
+            assert default.cancel_order(order_id) == ticked.cancel_order(order_id)
+        elif action < 0.2:
+            side = rng.choice([OrderSide.BUY, OrderSide.SELL])
+            qty = float(rng.randint(1, 20))
+            default.add_market_order(side, qty)
+            ticked.add_market_order(side, qty)
+        else:
+            side = rng.choice([OrderSide.BUY, OrderSide.SELL])
+            price = 100.0 + rng.randint(-15, 15) * 0.5
+            qty = float(rng.randint(1, 10))
+            live_ids.append(default.add_limit_order(side, price, qty))
+            ticked.add_limit_order(side, price, qty)
+
+    def fills(engine):
+        return [(t.buy_order_id, t.sell_order_id, t.price, t.quantity) for t in engine.get_trades()]
+
+    assert fills(default) == fills(ticked)
+    assert default.order_book.get_order_book_snapshot() == ticked.order_book.get_order_book_snapshot()
+
+
+def test_tick_grid_rejects_off_grid_price():
+    """Prices outside the grid or between ticks are rejected before matching."""
+    engine = MatchingEngine(tick_size=0.5, min_price=90.0, max_price=110.0)
+    with pytest.raises(ValueError):
+        engine.add_limit_order(OrderSide.BUY, 100.25, 1.0)
+    with pytest.raises(ValueError):
+        engine.add_limit_order(OrderSide.SELL, 111.0, 1.0)
+    assert engine.order_book.get_best_bid() is None
+
+
+def test_add_orders_batch_rejects_bad_batch_unchanged():
+    """A bad side value or an off-grid sell price leaves the book untouched."""
+    book = OrderBook(tick_size=0.5, min_price=90.0, max_price=110.0)
+    prices = np.array([100.0, 100.25])
+    qtys = np.ones(2)
+    ids = np.array([1, 2])
+    tss = np.zeros(2, dtype=np.int64)
+    with pytest.raises(ValueError):
+        book.add_orders_batch(prices, qtys, np.array([OrderSide.BUY.value, OrderSide.SELL.value]), ids, tss)
+    with pytest.raises(ValueError):
+        book.add_orders_batch(np.array([100.0, 101.0]), qtys, np.array([OrderSide.BUY.value, 7]), ids, tss)
+    assert book.get_order(1) is None
+    assert book.get_order_book_snapshot() == ([], [])
+
+
+def test_cancel_orders_batch(engine):
+    """Batch cancels report per-ID results and drop emptied levels."""
+    a = engine.add_limit_order(OrderSide.BUY, 100.0, 1.0)
+    b = engine.add_limit_order(OrderSide.BUY, 100.0, 2.0)
+    c = engine.add_limit_order(OrderSide.BUY, 99.0, 3.0)
+    d = engine.add_limit_order(OrderSide.SELL, 101.0, 4.0)
+
+    assert engine.cancel_orders([a, d, 999, b]) == [True, True, False, True]
+
+    book = engine.order_book
+    assert book.get_order_book_snapshot() == ([(99.0, 3.0)], [])
+    assert book.get_best_bid() == 99.0
+    assert book.get_best_ask() is None
+    assert list(book.orders_by_id) == [c]
+
+
+def test_tick_grid_keys_are_integer_ticks():
+    """On a tick grid levels are keyed by int tick and prices round-trip exactly."""
+    engine = MatchingEngine(tick_size=0.01, min_price=0.01, max_price=1000.0)
+    engine.add_limit_order(OrderSide.SELL, 100.01, 1.0)
+    engine.add_limit_order(OrderSide.BUY, 99.99, 1.0)
+
+    book = engine.order_book
+    assert list(book.sell_price_levels) == [10001]
+    assert list(book.buy_price_levels) == [-9999]
+    assert book.get_best_ask() == 100.01
+    assert book.get_snapshot()["buy_side"][0]["price"] == 99.99
+
+    engine.add_market_order(OrderSide.BUY, 1.0)
+    assert [t.price for t in engine.get_trades()] == [100.01]
+
+
+def test_snapshot_memoized_until_book_changes(engine):
+    """Repeated snapshots reuse the cached result until an add, fill or cancel."""
+    book = engine.order_book
+    order_id = engine.add_limit_order(OrderSide.SELL, 101.0, 2.0)
+
+    first = book.get_snapshot()
+    assert book.get_snapshot() is first
+    assert book.get_order_book_snapshot() is book.get_order_book_snapshot()
+
+    engine.add_market_order(OrderSide.BUY, 1.0)
+    after_fill = book.get_snapshot()
+    assert after_fill is not first
+    assert after_fill["sell_side"][0]["quantity"] == 1.0
+
+    engine.cancel_order(order_id)
+    assert book.get_snapshot()["sell_side"] == []
+    assert book.get_order_book_snapshot() == ([], [])
+
+
+def test_snapshot_consistent_under_concurrent_writer(engine):
+    """A reader thread never sees a torn snapshot while another thread writes."""
+    book = engine.order_book
+    done = threading.Event()
+    rng = random.Random(7)
+
+    def write():
+        live = []
+        for _ in range(3000):
+            if live and rng.random() < 0.4:
+                engine.cancel_order(live.pop(rng.randrange(len(live))))
+            else:
+                live.append(engine.add_limit_order(OrderSide.BUY, float(rng.randint(1, 200)), 1.0))
+        done.set()
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    writer = threading.Thread(target=write)
+    try:
+        writer.start()
+        while not done.is_set():
+            snapshot = book.get_snapshot()
+            prices = [level["price"] for level in snapshot["buy_side"]]
+            assert prices == sorted(set(prices), reverse=True)
+            assert sum(level["order_count"] for level in snapshot["buy_side"]) == snapshot["total_orders"]
+            assert sum(level["quantity"] for level in snapshot["buy_side"]) == snapshot["total_orders"]
+    finally:
+        writer.join()
+        sys.setswitchinterval(interval)
+
+
+def test_failed_trade_callback_leaves_book_readable(engine):
+    """A trade callback that raises mid-match doesn't leave readers spinning."""
+    engine.add_limit_order(OrderSide.SELL, 101.0, 2.0)
+
+    def fail(trade):
+        raise RuntimeError("callback failed")
+
+    engine.register_trade_callback(fail)
+    with pytest.raises(RuntimeError):
+        engine.add_market_order(OrderSide.BUY, 1.0)
+
+    assert engine.order_book._version % 2 == 0
+    assert engine.order_book.get_snapshot()["sell_side"][0]["quantity"] == 1.0
+
+
+def test_trade_callback_reads_book_mid_match(engine):
+    """A trade callback on the matching thread reads the book without waiting on the match."""
+    engine.add_limit_order(OrderSide.SELL, 101.0, 1.0)
+    engine.add_limit_order(OrderSide.SELL, 102.0, 1.0)
+    seen = []
+
+    def read(trade):
+        snapshot = engine.order_book.get_snapshot()
+        _, sell_levels = engine.order_book.get_order_book_snapshot()
+        stats = engine.statistics.calculate_price_statistics()
+        seen.append((snapshot["sell_side"][-1]["price"], len(sell_levels), stats["sell_side"]["depth"]))
+
+    engine.register_trade_callback(read)
+    engine.add_market_order(OrderSide.BUY, 2.0)
+
+    assert len(seen) == 2
+    assert engine.order_book.get_snapshot()["sell_side"] == []
+    assert engine.statistics.calculate_price_statistics()["sell_side"]["depth"] == 0
+
+
+def test_price_statistics_memoized_until_book_changes(engine):
+    """Price statistics are reused while the book is unchanged and rebuilt after a fill."""
+    engine.add_limit_order(OrderSide.BUY, 100.0, 2.0)
+    engine.add_limit_order(OrderSide.SELL, 101.0, 1.0)
+
+    stats = engine.statistics.calculate_price_statistics()
+    assert engine.statistics.calculate_price_statistics() is stats
+
+    engine.add_market_order(OrderSide.SELL, 0.5)
+    updated = engine.statistics.calculate_price_statistics()
+    assert updated is not stats
+    assert updated["buy_side"]["total_quantity"] == 1.5
+
+
+def test_price_statistics_scratch_grows(engine):
+    """Statistics read through the scratch buffer match the book's level lists past its initial size."""
+    for i in range(200):
+        engine.add_limit_order(OrderSide.BUY, 100.0 - i, 1.0)
+        engine.add_limit_order(OrderSide.SELL, 101.0 + i, 2.0)
+
+    stats = engine.statistics.calculate_price_statistics()
+    buy_levels, sell_levels = engine.order_book.get_order_book_snapshot()
+    assert stats["buy_side"] == engine.statistics.calculate_from_price_levels(buy_levels, sell_levels)["buy_side"]
+    assert stats["sell_side"]["depth"] == 200
+    assert stats["sell_side"]["total_quantity"] == 400.0
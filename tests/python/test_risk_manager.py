@@ -0,0 +1,73 @@
+"""
+Tests for the pre-trade risk manager.
+"""
+import logging
+import random
+
+import numpy as np
+
+from py_rs_quant.risk.manager import RiskManager, RiskCheckResult, decode_results
+
+
+def test_check_orders_batch_matches_check_order():
+    """The batch checks give the same result as checking each order on its own."""
+    risk_manager = RiskManager(
+        max_position_size={"BTCUSD": 5.0, "ETHUSD": 50.0},
+        max_order_size={"BTCUSD": 2.0},
+        max_exposure=200_000.0,
+        price_tolerance=0.05,
+    )
+    risk_manager.set_position("BTCUSD", 3.0)
+    risk_manager.set_position("SOLUSD", -7.0)
+    risk_manager.current_exposure = 100_000.0
+    risk_manager.update_reference_price("BTCUSD", 50_000.0)
+    risk_manager.update_reference_price("ETHUSD", 3_000.0)
+
+    rng = random.Random(7)
+    symbols, sizes, prices, check_tolerance = [], [], [], []
+    for _ in range(500):
+        symbol = rng.choice(["BTCUSD", "ETHUSD", "SOLUSD", "XRPUSD"])
+        reference = {"BTCUSD": 50_000.0, "ETHUSD": 3_000.0, "SOLUSD": 100.0, "XRPUSD": 0.5}[symbol]
+        symbols.append(symbol)
+        sizes.append(rng.uniform(-4.0, 4.0) * (10.0 if symbol == "ETHUSD" else 1.0))
+        prices.append(reference * rng.uniform(0.9, 1.1))
+        check_tolerance.append(rng.random() < 0.8)
+
+    logging.disable(logging.WARNING)
+    try:
+        expected = [
+            risk_manager.check_order(symbol, size, price, check)
+            for symbol, size, price, check in zip(symbols, sizes, prices, check_tolerance)
+        ]
+        results = risk_manager.check_orders_batch(symbols, np.array(sizes), np.array(prices),
+                                                  np.array(check_tolerance))
+        from_array = risk_manager.check_orders_batch(np.array(symbols), np.array(sizes),
+                                                     np.array(prices), np.array(check_tolerance))
+    finally:
+        logging.disable(logging.NOTSET)
+
+    assert results.dtype == np.int8
+    assert results.tolist() == expected
+    assert from_array.tolist() == expected
+    assert decode_results(results) == expected
+    assert len(set(expected)) == len(RiskCheckResult)  # Every outcome is exercised
+
+
+def test_update_after_fills_batch_matches_update_after_fill():
+    """A batch of fills leaves the same positions and exposure as applying them one by one."""
+    symbols = ["BTCUSD", "ETHUSD", "BTCUSD", "SOLUSD", "ETHUSD", "BTCUSD"]
+    sizes = [1.5, -20.0, -0.5, 100.0, 5.0, 2.0]
+    prices = [50_000.0, 3_000.0, 50_100.0, 100.0, 2_990.0, 49_900.0]
+
+    one_by_one = RiskManager()
+    batched = RiskManager()
+    for risk_manager in (one_by_one, batched):
+        risk_manager.set_position("ETHUSD", 10.0)
+        risk_manager.current_exposure = 1_000.0
+
+    for symbol, size, price in zip(symbols, sizes, prices):
+        one_by_one.update_after_fill(symbol, size, price)
+    batched.update_after_fills_batch(symbols, np.array(sizes), np.array(prices))
+
+    assert batched.positions == one_by_one.positions
+    assert batched.current_exposure == one_by_one.current_exposure
@@ -0,0 +1,118 @@
+"""
+Tests for the Rust matching engine extension.
+
+Skipped unless the extension is built (maturin develop in matching_engine/).
+"""
+import numpy as np
+import pytest
+
+from py_rs_quant.core.enums import OrderSide, OrderType
+
+try:
+    # Import the names: an unbuilt crate directory still imports as a namespace package
+    from matching_engine import PyOrderBook, PyOrderSide
+except ImportError:
+    pytest.skip("matching_engine extension is not built", allow_module_level=True)
+
+TIMESTAMP = 12345678
+
+# (side, type, price, quantity) rows that rest, cross, sweep levels and partially fill
+BATCH = [
+    (OrderSide.SELL, OrderType.LIMIT, 101.0, 1.0),
+    (OrderSide.SELL, OrderType.LIMIT, 102.0, 2.0),
+    (OrderSide.BUY, OrderType.LIMIT, 99.0, 1.5),
+    (OrderSide.BUY, OrderType.MARKET, 0.0, 1.5),
+    (OrderSide.SELL, OrderType.LIMIT, 98.0, 2.0),
+    (OrderSide.BUY, OrderType.LIMIT, 102.0, 3.0),
+    (OrderSide.SELL, OrderType.MARKET, 0.0, 0.25),
+]
+
+
+@pytest.fixture
+def order_book():
+    """Create a fresh Rust order book with a resting buy at 100 and a resting sell at 101."""
+    book = PyOrderBook()
+    book.add_limit_order(PyOrderSide.Buy, 100.0, 1.0, TIMESTAMP)
+    book.add_limit_order(PyOrderSide.Sell, 101.0, 0.5, TIMESTAMP)
+    return book
+
+
+def test_limit_orders_rest_without_crossing(order_book):
+    """Non-crossing limit orders each rest on their own side of the book."""
+    buy_levels, sell_levels = order_book.get_order_book_snapshot()
+    assert buy_levels == [(100.0, 1.0)]
+    assert sell_levels == [(101.0, 0.5)]
+    assert order_book.get_trades() == []
+
+
+def test_market_order_fills_resting_sell(order_book):
+    """A market buy fills against the resting sell and empties its level."""
+    market_order_id = order_book.add_market_order(PyOrderSide.Buy, 0.5, TIMESTAMP)
+    assert market_order_id >= 0
+
+    trades = order_book.get_trades()
+    assert len(trades) == 1
+    _, sell_levels = order_book.get_order_book_snapshot()
+    assert sell_levels == []
+
+
+def _trade_rows(book):
+    return [(t.trade_id, t.buy_order_id, t.sell_order_id, t.price, t.quantity)
+            for t in book.get_trades()]
+
+
+def test_batch_add_orders_matches_one_by_one():
+    """A column batch is matched in submission order, exactly like single adds."""
+    single = PyOrderBook()
+    single_ids = []
+    for side, order_type, price, quantity in BATCH:
+        rust_side = PyOrderSide.Buy if side == OrderSide.BUY else PyOrderSide.Sell
+        if order_type == OrderType.LIMIT:
+            single_ids.append(single.add_limit_order(rust_side, price, quantity, TIMESTAMP))
+        else:
+            single_ids.append(single.add_market_order(rust_side, quantity, TIMESTAMP))
+
+    batched = PyOrderBook()
+    sides, order_types, prices, quantities = zip(*BATCH)
+    batch_ids = batched.batch_add_orders([int(v) for v in sides], [int(v) for v in order_types],
+                                         list(prices), list(quantities), [TIMESTAMP] * len(BATCH))
+
+    assert batch_ids == single_ids
+    assert batched.get_order_book_snapshot() == single.get_order_book_snapshot()
+    assert _trade_rows(batched) == _trade_rows(single)
+
+
+@pytest.mark.parametrize("sides, order_types", [
+    ([1, 3], [2, 2]),
+    ([1, 2], [2, 0]),
+])
+def test_batch_add_orders_rejects_bad_rows_unchanged(order_book, sides, order_types):
+    """An invalid side or type anywhere in the batch raises before any row is added."""
+    before = order_book.get_order_book_snapshot()
+    with pytest.raises(ValueError):
+        order_book.batch_add_orders(sides, order_types, [101.0, 100.0], [1.0, 1.0],
+                                    [TIMESTAMP, TIMESTAMP])
+    assert order_book.get_order_book_snapshot() == before
+    assert order_book.get_trade_count() == 0
+
+
+def test_column_getters_agree_with_objects(order_book):
+    """Level columns, trade arrays and the trade count match the object-based getters."""
+    order_book.add_limit_order(PyOrderSide.Sell, 102.0, 2.0, TIMESTAMP)
+    order_book.add_market_order(PyOrderSide.Buy, 1.0, TIMESTAMP)
+    order_book.add_market_order(PyOrderSide.Sell, 0.25, TIMESTAMP)
+
+    buy_levels, sell_levels = order_book.get_order_book_snapshot()
+    buy_prices, buy_qtys, sell_prices, sell_qtys = order_book.get_level_columns()
+    assert list(zip(buy_prices, buy_qtys)) == buy_levels
+    assert list(zip(sell_prices, sell_qtys)) == sell_levels
+
+    trades = order_book.get_trades()
+    assert order_book.get_trade_count() == len(trades) == 3
+    ids, buy_ids, sell_ids, prices, quantities, timestamps = order_book.get_trade_arrays()
+    np.testing.assert_array_equal(ids, [t.trade_id for t in trades])
+    np.testing.assert_array_equal(buy_ids, [t.buy_order_id for t in trades])
+    np.testing.assert_array_equal(sell_ids, [t.sell_order_id for t in trades])
+    np.testing.assert_array_equal(prices, [t.price for t in trades])
+    np.testing.assert_array_equal(quantities, [t.quantity for t in trades])
+    np.testing.assert_array_equal(timestamps, [t.timestamp for t in trades])
@@ -0,0 +1,18 @@
+"""
+Tests for the core utility helpers.
+"""
+import pytest
+
+from py_rs_quant.core.utils import pack_key
+
+
+def test_pack_key_keeps_signed_ticks_distinct():
+    """Negative (buy side) ticks pack to keys distinct from every other pair."""
+    pairs = [(1, -1), (1, 2**31 - 1), (1, 0), (1, -9999), (2, -2**31), (0, 5), (-3, 7)]
+    keys = [pack_key(high, low) for high, low in pairs]
+    assert len(set(keys)) == len(pairs)
+
+    with pytest.raises(ValueError):
+        pack_key(1, 2**31)
+    with pytest.raises(ValueError):
+        pack_key(1, -2**31 - 1)